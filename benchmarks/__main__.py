@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Dict
+
+from benchmarks.compare import compare_results
+from benchmarks.encoding import run_encoding_benchmark
+from benchmarks.load import DEFAULT_MIX, LoadConfig, Workload, load_user_ids, open_client
+from benchmarks.mapping import run_mapping_benchmark
+from benchmarks.seed import seed_users
+from benchmarks.serialization import run_serialization_benchmark
+from src.infrastructure.database.connection import db_connection
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def print_summary(summary: Dict[str, dict]) -> None:
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 65)
+    for endpoint, stats in summary.items():
+        print(
+            f"{endpoint:<10} {stats['requests']:>9} {stats['errors']:>7} "
+            f"{stats['throughput_rps']:>9.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+
+async def run(args) -> int:
+    config = LoadConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mix=args.mix,
+        list_limit=args.list_limit,
+        seed=args.seed,
+        warmup=args.warmup,
+        url=args.url,
+    )
+
+    if args.seed_users:
+        await db_connection.connect()
+        try:
+            inserted = await seed_users(db_connection, args.seed_users)
+        finally:
+            await db_connection.disconnect()
+        print(f"Seeded {inserted} user(s)")
+
+    async with open_client(config) as client:
+        user_ids = await load_user_ids(client)
+        summary = await Workload(client, config, user_ids).run()
+
+    print_summary(summary)
+    if args.output:
+        result = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {
+                "requests": config.requests,
+                "concurrency": config.concurrency,
+                "mix": config.mix,
+                "list_limit": config.list_limit,
+                "seed": config.seed,
+                "warmup": config.warmup,
+                "mode": "socket" if config.url else "in-process",
+            },
+            "results": summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    return 0
+
+
+async def serialization(args) -> int:
+    results = await run_serialization_benchmark(rows=args.rows, iterations=args.iterations)
+    print(f"GET /users?limit={args.rows}, {args.iterations} iterations")
+    print(f"{'path':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>9}")
+    for name in ("legacy", "fast"):
+        stats = results[name]
+        print(
+            f"{name:<8} {stats['mean_ms']:>9.2f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['bytes']:>9}"
+        )
+    print(f"\nSpeedup: {results['speedup']['mean']:.1f}x")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+async def encoding(args) -> int:
+    results = await run_encoding_benchmark(rows=args.rows, iterations=args.iterations)
+    print(f"GET /users?limit={args.rows}, {args.iterations} iterations")
+    print(f"{'variant':<14} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>9} {'ratio':>7}")
+    for name, stats in results.items():
+        print(
+            f"{name:<14} {stats['mean_ms']:>9.2f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['bytes']:>9} {stats['ratio']:>7.2f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+async def mapping(args) -> int:
+    await db_connection.connect()
+    try:
+        results = await run_mapping_benchmark(db_connection, rows=args.rows, iterations=args.iterations)
+    finally:
+        await db_connection.disconnect()
+    print(f"Row mapping, {args.rows} rows per page, {args.iterations} iterations")
+    print(f"{'mapper':<8} {'us/page':>10} {'bytes/page':>12}")
+    for name, stats in results.items():
+        print(f"{name:<8} {stats['us_per_page']:>10.1f} {stats['bytes_per_page']:>12}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = compare_results(baseline, current, threshold=args.threshold, metric=args.metric)
+    if regressions:
+        print(f"❌ Regressions over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"✅ No regressions over {args.threshold:.0%}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the mixed API workload")
+    run_parser.add_argument("--requests", type=int, default=2000)
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                            help="Operation weights, e.g. create=1,get=5,list=2,update=1,delete=1")
+    run_parser.add_argument("--list-limit", type=int, default=100)
+    run_parser.add_argument("--seed", type=int, default=42, help="Random seed for the workload")
+    run_parser.add_argument("--warmup", type=int, default=100,
+                            help="Requests to run before measuring")
+    run_parser.add_argument("--seed-users", type=int, default=0,
+                            help="Insert this many users before the run")
+    run_parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    run_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    compare_parser = subparsers.add_parser("compare", help="Fail if current results regress")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.add_argument("--metric", default="p95_ms",
+                                choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+
+    serialization_parser = subparsers.add_parser(
+        "serialization", help="Compare validated and fast JSON list responses"
+    )
+    serialization_parser.add_argument("--rows", type=int, default=1000)
+    serialization_parser.add_argument("--iterations", type=int, default=200)
+    serialization_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    encoding_parser = subparsers.add_parser(
+        "encoding", help="Compare JSON, msgpack, gzip and zstd list responses"
+    )
+    encoding_parser.add_argument("--rows", type=int, default=1000)
+    encoding_parser.add_argument("--iterations", type=int, default=200)
+    encoding_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    mapping_parser = subparsers.add_parser(
+        "mapping", help="Compare per-field and bulk row-to-entity mapping"
+    )
+    mapping_parser.add_argument("--rows", type=int, default=1000)
+    mapping_parser.add_argument("--iterations", type=int, default=200)
+    mapping_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return compare(args)
+    if args.command == "serialization":
+        return asyncio.run(serialization(args))
+    if args.command == "encoding":
+        return asyncio.run(encoding(args))
+    if args.command == "mapping":
+        return asyncio.run(mapping(args))
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+from typing import Dict, List
+
+
+def compare_results(
+    baseline: Dict[str, dict],
+    current: Dict[str, dict],
+    threshold: float = 0.10,
+    metric: str = "p95_ms",
+) -> List[str]:
+    regressions = []
+    for endpoint, baseline_stats in sorted(baseline.items()):
+        current_stats = current.get(endpoint)
+        if current_stats is None:
+            continue
+        if baseline_stats[metric] > 0 and current_stats[metric] > baseline_stats[metric] * (1 + threshold):
+            regressions.append(
+                f"{endpoint}: {metric} {baseline_stats[metric]:.2f} -> {current_stats[metric]:.2f}"
+            )
+        baseline_rps = baseline_stats["throughput_rps"]
+        if baseline_rps > 0 and current_stats["throughput_rps"] < baseline_rps * (1 - threshold):
+            regressions.append(
+                f"{endpoint}: throughput_rps {baseline_rps:.1f} -> {current_stats['throughput_rps']:.1f}"
+            )
+    return regressions
@@ -0,0 +1,59 @@
+import time
+from typing import Dict, List
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.load import percentile
+from benchmarks.serialization import build_users
+from src.domain.entities.user import User
+from src.presentation.api.dependencies import get_response_encoder
+from src.presentation.api.responses import ResponseEncoder
+
+
+VARIANTS = {
+    "json": {"Accept": "application/json", "Accept-Encoding": "identity"},
+    "json+gzip": {"Accept": "application/json", "Accept-Encoding": "gzip"},
+    "json+zstd": {"Accept": "application/json", "Accept-Encoding": "zstd"},
+    "msgpack": {"Accept": "application/msgpack", "Accept-Encoding": "identity"},
+    "msgpack+zstd": {"Accept": "application/msgpack", "Accept-Encoding": "zstd"},
+}
+
+
+def build_app(users: List[User]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/users")
+    async def list_users(encoder: ResponseEncoder = Depends(get_response_encoder)):
+        return await encoder.users(users)
+
+    return app
+
+
+async def measure(client: AsyncClient, headers: Dict[str, str], iterations: int) -> Dict[str, float]:
+    latencies = []
+    wire_bytes = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.get("/users", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        # Length before client-side decompression: the bytes on the wire.
+        wire_bytes = int(response.headers["content-length"])
+    latencies.sort()
+    return {
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "bytes": wire_bytes,
+    }
+
+
+async def run_encoding_benchmark(rows: int = 1000, iterations: int = 200) -> Dict[str, dict]:
+    app = build_app(build_users(rows))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        results = {
+            name: await measure(client, headers, iterations) for name, headers in VARIANTS.items()
+        }
+    for stats in results.values():
+        stats["ratio"] = stats["bytes"] / results["json"]["bytes"]
+    return results
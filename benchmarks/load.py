@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient, Limits
+
+from src.presentation.api.app import create_app
+
+
+DEFAULT_MIX = {"create": 1, "get": 5, "list": 2, "update": 1, "delete": 1}
+
+
+@dataclass
+class LoadConfig:
+    requests: int = 2000
+    concurrency: int = 32
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    list_limit: int = 100
+    seed: int = 42
+    warmup: int = 100
+    url: Optional[str] = None
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(stats: Dict[str, EndpointStats], elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for endpoint, endpoint_stats in sorted(stats.items()):
+        latencies = sorted(endpoint_stats.latencies)
+        count = len(latencies)
+        summary[endpoint] = {
+            "requests": count,
+            "errors": endpoint_stats.errors,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "mean_ms": (sum(latencies) / count * 1000) if count else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+    return summary
+
+
+@asynccontextmanager
+async def open_client(config: LoadConfig) -> AsyncIterator[AsyncClient]:
+    limits = Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+    if config.url:
+        async with AsyncClient(base_url=config.url, limits=limits, timeout=30.0) as client:
+            yield client
+        return
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+            yield client
+
+
+async def load_user_ids(client: AsyncClient, limit: int = 1000) -> List[int]:
+    response = await client.get("/users/", params={"limit": limit, "order": "desc"})
+    response.raise_for_status()
+    return [user["id"] for user in response.json()]
+
+
+class Workload:
+    def __init__(self, client: AsyncClient, config: LoadConfig, user_ids: List[int]):
+        self.client = client
+        self.config = config
+        self.user_ids = list(user_ids)
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in config.mix}
+        self._operations = list(config.mix)
+        self._weights = [config.mix[name] for name in self._operations]
+        self._counter = 0
+
+    def _pick_user_id(self, rng: random.Random) -> int:
+        return rng.choice(self.user_ids) if self.user_ids else 1
+
+    async def _create(self, rng: random.Random):
+        self._counter += 1
+        response = await self.client.post(
+            "/users/",
+            json={
+                "email": f"bench-{self.config.seed}-{self._counter}-{rng.getrandbits(32)}@bench.example.com",
+                "name": "Bench User",
+            },
+        )
+        if response.status_code == 201:
+            self.user_ids.append(response.json()["id"])
+        return response, {201}
+
+    async def _get(self, rng: random.Random):
+        return await self.client.get(f"/users/{self._pick_user_id(rng)}"), {200, 404}
+
+    async def _list(self, rng: random.Random):
+        response = await self.client.get("/users/", params={"limit": self.config.list_limit})
+        return response, {200}
+
+    async def _update(self, rng: random.Random):
+        response = await self.client.put(
+            f"/users/{self._pick_user_id(rng)}", json={"name": f"Bench {rng.getrandbits(16)}"}
+        )
+        return response, {200, 404}
+
+    async def _delete(self, rng: random.Random):
+        if not self.user_ids:
+            return await self.client.delete("/users/0"), {404}
+        user_id = self.user_ids.pop(rng.randrange(len(self.user_ids)))
+        return await self.client.delete(f"/users/{user_id}"), {204, 404}
+
+    async def _worker(self, worker_id: int, requests: int):
+        rng = random.Random(self.config.seed * 1000 + worker_id)
+        for _ in range(requests):
+            operation = rng.choices(self._operations, weights=self._weights)[0]
+            started = time.perf_counter()
+            try:
+                response, expected = await getattr(self, f"_{operation}")(rng)
+                ok = response.status_code in expected
+            except Exception:
+                ok = False
+            stats = self.stats[operation]
+            stats.latencies.append(time.perf_counter() - started)
+            if not ok:
+                stats.errors += 1
+
+    async def _run_workers(self, requests: int) -> None:
+        per_worker, remainder = divmod(requests, self.config.concurrency)
+        await asyncio.gather(
+            *(
+                self._worker(worker_id, per_worker + (1 if worker_id < remainder else 0))
+                for worker_id in range(self.config.concurrency)
+            )
+        )
+
+    async def run(self) -> Dict[str, dict]:
+        if self.config.warmup:
+            await self._run_workers(self.config.warmup)
+            self.stats = {name: EndpointStats() for name in self.config.mix}
+
+        started = time.perf_counter()
+        await self._run_workers(self.config.requests)
+        elapsed = time.perf_counter() - started
+        combined = EndpointStats(
+            latencies=[latency for stats in self.stats.values() for latency in stats.latencies],
+            errors=sum(stats.errors for stats in self.stats.values()),
+        )
+        return summarize({**self.stats, "total": combined}, elapsed)
@@ -0,0 +1,51 @@
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from src.domain.entities.user import User
+from src.infrastructure.database.connection import DatabaseConnection
+from src.infrastructure.repositories.postgres_user_repository import map_rows_to_users
+
+
+PAGE_QUERY = """
+    select g as id, 'user' || g || '@example.com' as email, 'User ' || g as name,
+           now()::timestamp as created_at, now()::timestamp as updated_at
+    from generate_series(1, $1::int) as g
+"""
+
+
+def legacy_map_rows(rows) -> List[User]:
+    return [
+        User(
+            id=row['id'],
+            email=row['email'],
+            name=row['name'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+        )
+        for row in rows
+    ]
+
+
+def _measure(mapper: Callable, rows, iterations: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        mapper(rows)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    users = mapper(rows)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del users
+    return {"us_per_page": elapsed / iterations * 1_000_000, "bytes_per_page": allocated}
+
+
+async def run_mapping_benchmark(
+    db: DatabaseConnection, rows: int = 1000, iterations: int = 200
+) -> Dict[str, dict]:
+    records = await db.fetch(PAGE_QUERY, rows)
+    return {
+        "legacy": _measure(legacy_map_rows, records, iterations),
+        "bulk": _measure(map_rows_to_users, records, iterations),
+    }
@@ -0,0 +1,22 @@
+from src.infrastructure.database.connection import DatabaseConnection
+
+
+SEED_EMAIL_DOMAIN = "seed.example.com"
+
+
+async def seed_users(db: DatabaseConnection, count: int, chunk_size: int = 100000) -> int:
+    inserted = 0
+    for start in range(1, count + 1, chunk_size):
+        stop = min(start + chunk_size - 1, count)
+        result = await db.execute(
+            f"""
+            insert into users (email, name)
+            select 'seed-' || g || '@{SEED_EMAIL_DOMAIN}', 'Seed User ' || g
+            from generate_series($1::int, $2::int) as g
+            on conflict (email) do nothing
+            """,
+            start, stop
+        )
+        inserted += int(result.split()[-1])
+    return inserted
+
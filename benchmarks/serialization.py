@@ -0,0 +1,72 @@
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.load import percentile
+from src.domain.entities.user import User
+from src.presentation.api.responses import users_json_response
+from src.presentation.schemas.user_schemas import UserResponse
+
+
+def build_users(rows: int) -> List[User]:
+    now = datetime.now()
+    return [
+        User(id=i, email=f"user{i}@example.com", name=f"User {i}", created_at=now, updated_at=now)
+        for i in range(1, rows + 1)
+    ]
+
+
+def build_app(users: List[User]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=List[UserResponse])
+    async def legacy():
+        return [
+            UserResponse(
+                id=user.id,
+                email=user.email,
+                name=user.name,
+                created_at=user.created_at,
+                updated_at=user.updated_at,
+            )
+            for user in users
+        ]
+
+    @app.get("/fast", response_model=List[UserResponse])
+    async def fast():
+        return users_json_response(users)
+
+    return app
+
+
+async def measure(client: AsyncClient, path: str, iterations: int) -> Dict[str, float]:
+    latencies = []
+    body = b""
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        body = response.content
+    latencies.sort()
+    return {
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "bytes": len(body),
+    }
+
+
+async def run_serialization_benchmark(rows: int = 1000, iterations: int = 200) -> Dict[str, dict]:
+    app = build_app(build_users(rows))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        legacy_body = (await client.get("/legacy")).json()
+        assert legacy_body == (await client.get("/fast")).json()
+        results = {
+            "legacy": await measure(client, "/legacy", iterations),
+            "fast": await measure(client, "/fast", iterations),
+        }
+    results["speedup"] = {"mean": results["legacy"]["mean_ms"] / results["fast"]["mean_ms"]}
+    return results
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Optional
+
+from src.domain.repositories.user_repository import UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+# Counted once, refreshed in the background; create/delete adjust it in between.
+class UserCounter:
+    def __init__(self, user_repository: UserRepository, refresh_interval: float = 60.0):
+        self.user_repository = user_repository
+        self.refresh_interval = refresh_interval
+        self._value: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self) -> int:
+        if self._value is None:
+            await self.refresh()
+            if self.refresh_interval > 0 and self._task is None:
+                self._task = asyncio.create_task(self._refresh_periodically())
+        return self._value
+
+    async def refresh(self) -> int:
+        self._value = await self.user_repository.count()
+        return self._value
+
+    def adjust(self, delta: int) -> None:
+        if self._value is not None:
+            self._value = max(0, self._value + delta)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh cached user count")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
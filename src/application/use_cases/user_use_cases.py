@@ -1,23 +1,76 @@
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
 
-from src.domain.entities.user import User
-from src.domain.exceptions import EntityAlreadyExists, EntityNotFound, ValidationError
-from src.domain.repositories.user_repository import UserRepository
+from src.application.services.user_counter import UserCounter
+
+from src.domain.entities.user import USER_FIELDS, User
+from src.domain.entities.user_change import UserChange
+from src.domain.exceptions import (
+    EntityAlreadyExists,
+    EntityNotFound,
+    PreconditionFailed,
+    ValidationError,
+)
+from src.domain.repositories.user_change_feed import UserChangeFeed
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
+
+
+CountMode = Literal["exact", "estimated", "cached"]
+
+
+def _projection_fields(fields: Sequence[str]) -> Tuple[str, ...]:
+    unknown = sorted(set(fields) - set(USER_FIELDS))
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(unknown)}")
+    if not fields:
+        raise ValidationError("At least one field is required")
+    return tuple(field for field in USER_FIELDS if field in fields)
 
 
 class CreateUserUseCase:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, counter: Optional[UserCounter] = None):
         self.user_repository = user_repository
+        self.counter = counter
 
     async def execute(self, email: str, name: str) -> User:
         if not email or not name:
             raise ValidationError("Email and name are required")
-        existing_user = await self.user_repository.get_by_email(email)
-        if existing_user:
+
+        user = await self.user_repository.create(User(id=None, email=email, name=name))
+        if not user:
             raise EntityAlreadyExists(f"User with email {email} already exists")
+        if self.counter:
+            self.counter.adjust(1)
+        return user
+
+
+class CreateUsersBatchUseCase:
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        max_batch_size: int = 10000,
+        counter: Optional[UserCounter] = None,
+    ):
+        self.user_repository = user_repository
+        self.max_batch_size = max_batch_size
+        self.counter = counter
 
-        user = User(id=None, email=email, name=name)
-        return await self.user_repository.create(user)
+    async def execute(self, users: List[Tuple[str, str]]) -> List[Optional[User]]:
+        if not users:
+            raise ValidationError("At least one user is required")
+        if len(users) > self.max_batch_size:
+            raise ValidationError(f"Batch size exceeds the limit of {self.max_batch_size} users")
+        for index, (email, name) in enumerate(users):
+            if not email or not name:
+                raise ValidationError(f"Email and name are required (item {index})")
+
+        created_users = await self.user_repository.create_many(
+            [User(id=None, email=email, name=name) for email, name in users]
+        )
+        if self.counter:
+            self.counter.adjust(sum(1 for user in created_users if user))
+        return created_users
 
 
 class GetUserUseCase:
@@ -31,41 +84,282 @@ class GetUserUseCase:
         return user
 
 
-class GetAllUsersUseCase:
+class GetUserProjectionUseCase:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
 
-    async def execute(self, limit: int = 100, offset: int = 0) -> List[User]:
-        return await self.user_repository.get_all(limit=limit, offset=offset)
+    async def execute(self, user_id: int, fields: Sequence[str]) -> Dict[str, Any]:
+        projection = await self.user_repository.get_projection(user_id, _projection_fields(fields))
+        if projection is None:
+            raise EntityNotFound(f"User with id {user_id} not found")
+        return projection
 
 
-class UpdateUserUseCase:
+class GetUserVersionUseCase:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
 
-    async def execute(self, user_id: int, email: Optional[str] = None, name: Optional[str] = None) -> User:
-        existing_user = await self.user_repository.get_by_id(user_id)
-        if not existing_user:
+    async def execute(self, user_id: int) -> datetime:
+        version = await self.user_repository.get_version(user_id)
+        if version is None:
             raise EntityNotFound(f"User with id {user_id} not found")
+        return version
+
+
+class GetAllUsersUseCase:
+    def __init__(self, user_repository: UserRepository):
+        self.user_repository = user_repository
+
+    async def execute(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        return await self.user_repository.get_all(
+            limit=limit, offset=offset, after_id=after_id, descending=descending
+        )
+
+
+class GetAllUsersProjectionUseCase:
+    def __init__(self, user_repository: UserRepository):
+        self.user_repository = user_repository
+
+    async def execute(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return await self.user_repository.get_all_projected(
+            _projection_fields(fields),
+            limit=limit,
+            offset=offset,
+            after_id=after_id,
+            descending=descending,
+        )
+
+
+class SearchUsersUseCase:
+    def __init__(self, user_repository: UserRepository, min_query_length: int = 3):
+        self.user_repository = user_repository
+        self.min_query_length = min_query_length
+
+    async def execute(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        query = query.strip().lower()
+        if not query:
+            raise ValidationError("Search query is required")
+        if len(query) < self.min_query_length:
+            raise ValidationError(
+                f"Search query must be at least {self.min_query_length} characters long"
+            )
+        return await self.user_repository.search(query, limit=limit, prefix=prefix, after=after)
+
 
-        if email:
-            existing_user.email = email
-        if name:
-            existing_user.name = name
+class CountUsersUseCase:
+    def __init__(self, user_repository: UserRepository, counter: UserCounter):
+        self.user_repository = user_repository
+        self.counter = counter
+
+    async def execute(self, mode: CountMode = "exact") -> int:
+        if mode == "exact":
+            return await self.user_repository.count()
+        if mode == "estimated":
+            return await self.user_repository.estimate_count()
+        if mode == "cached":
+            return await self.counter.get()
+        raise ValidationError(f"Unknown count mode: {mode}")
+
+
+class ExportUsersUseCase:
+    def __init__(self, user_repository: UserRepository, batch_size: int = 1000):
+        self.user_repository = user_repository
+        self.batch_size = batch_size
+
+    def execute(self) -> AsyncIterator[User]:
+        return self.user_repository.iter_all(batch_size=self.batch_size)
+
+
+class StreamUserChangesUseCase:
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        change_feed: Optional[UserChangeFeed],
+        batch_size: int = 1000,
+    ):
+        self.user_repository = user_repository
+        self.change_feed = change_feed
+        self.batch_size = batch_size
+
+    def execute(
+        self,
+        since: Optional[datetime] = None,
+        after_id: int = 0,
+    ) -> AsyncIterator[Optional[UserChange]]:
+        # Subscribe before catching up so no change falls in between; duplicates are possible.
+        subscription = self.change_feed.subscribe()
+        return self._stream(subscription, since, after_id)
+
+    async def _catch_up(
+        self,
+        since: datetime,
+        after_id: int,
+    ) -> Tuple[List[UserChange], Optional[Tuple[datetime, int]]]:
+        users = await self.user_repository.get_updated_since(
+            since, after_id=after_id, limit=self.batch_size
+        )
+        deleted = await self.user_repository.get_deleted_since(
+            since, after_id=after_id, limit=self.batch_size
+        )
+        changes = [
+            UserChange(
+                op="insert" if user.created_at == user.updated_at else "update",
+                user_id=user.id,
+                changed_at=user.updated_at,
+                user=user,
+            )
+            for user in users
+        ]
+        changes.extend(
+            UserChange(op="delete", user_id=user_id, changed_at=deleted_at)
+            for user_id, deleted_at in deleted
+        )
+        changes.sort(key=lambda change: (change.changed_at, change.user_id))
+
+        # A full page may be followed by rows sorting before the other page's tail.
+        bounds = []
+        if len(users) == self.batch_size:
+            bounds.append((users[-1].updated_at, users[-1].id))
+        if len(deleted) == self.batch_size:
+            user_id, deleted_at = deleted[-1]
+            bounds.append((deleted_at, user_id))
+        if not bounds:
+            return changes, None
+        bound = min(bounds)
+        changes = [change for change in changes if (change.changed_at, change.user_id) <= bound]
+        return changes, bound
+
+    async def _stream(
+        self,
+        subscription: AsyncIterator[Optional[UserChange]],
+        since: Optional[datetime],
+        after_id: int,
+    ) -> AsyncIterator[Optional[UserChange]]:
+        try:
+            while since is not None:
+                changes, bound = await self._catch_up(since, after_id)
+                for change in changes:
+                    yield change
+                if bound is None:
+                    break
+                since, after_id = bound
+
+            async for change in subscription:
+                yield change
+        finally:
+            await subscription.aclose()
+
+
+class UpdateUserUseCase:
+    def __init__(self, user_repository: UserRepository):
+        self.user_repository = user_repository
 
-        updated_user = await self.user_repository.update(existing_user)
+    async def execute(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> User:
+        updated_user = await self.user_repository.update(
+            user_id, email=email or None, name=name or None, expected_updated_at=expected_updated_at
+        )
         if not updated_user:
+            if expected_updated_at and await self.user_repository.get_version(user_id):
+                raise PreconditionFailed(f"User with id {user_id} has been modified")
             raise EntityNotFound(f"User with id {user_id} not found")
         return updated_user
 
 
+def _validate_batch_ids(user_ids: List[int], max_batch_size: int) -> None:
+    if not user_ids:
+        raise ValidationError("At least one user is required")
+    if len(user_ids) > max_batch_size:
+        raise ValidationError(f"Batch size exceeds the limit of {max_batch_size} users")
+    if len(set(user_ids)) != len(user_ids):
+        raise ValidationError("User ids in a batch must be unique")
+
+
+class UpdateUsersBatchUseCase:
+    def __init__(self, user_repository: UserRepository, max_batch_size: int = 1000):
+        self.user_repository = user_repository
+        self.max_batch_size = max_batch_size
+
+    async def execute(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        _validate_batch_ids([user_id for user_id, _, _ in updates], self.max_batch_size)
+        for index, (_, email, name) in enumerate(updates):
+            if not email and not name:
+                raise ValidationError(f"Email or name is required (item {index})")
+
+        # Items claiming the same email would all pass the uniqueness check and then
+        # fail the whole statement, so they are reported as conflicts up front.
+        claims = Counter(email.lower() for _, email, _ in updates if email)
+        results: Dict[int, Tuple[BatchUpdateStatus, Optional[User]]] = {}
+        pending = []
+        for user_id, email, name in updates:
+            if email and claims[email.lower()] > 1:
+                results[user_id] = ("conflict", None)
+            else:
+                pending.append((user_id, email or None, name or None))
+
+        if pending:
+            outcomes = await self.user_repository.update_many(pending)
+            for (user_id, _, _), outcome in zip(pending, outcomes):
+                results[user_id] = outcome
+        return [results[user_id] for user_id, _, _ in updates]
+
+
+class DeleteUsersBatchUseCase:
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        max_batch_size: int = 1000,
+        counter: Optional[UserCounter] = None,
+    ):
+        self.user_repository = user_repository
+        self.max_batch_size = max_batch_size
+        self.counter = counter
+
+    async def execute(self, user_ids: List[int]) -> List[bool]:
+        _validate_batch_ids(user_ids, self.max_batch_size)
+        deleted = set(await self.user_repository.delete_many(user_ids))
+        if self.counter:
+            self.counter.adjust(-len(deleted))
+        return [user_id in deleted for user_id in user_ids]
+
+
 class DeleteUserUseCase:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, counter: Optional[UserCounter] = None):
         self.user_repository = user_repository
+        self.counter = counter
 
     async def execute(self, user_id: int) -> bool:
         result = await self.user_repository.delete(user_id)
         if not result:
             raise EntityNotFound(f"User with id {user_id} not found")
+        if self.counter:
+            self.counter.adjust(-1)
         return result
 
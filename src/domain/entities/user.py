@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: Optional[int]
     email: str
@@ -15,3 +15,6 @@ class User:
         if self.email:
             self.email = self.email.lower()
 
+
+USER_FIELDS = tuple(field.name for field in fields(User))
+
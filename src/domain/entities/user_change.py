@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal, Optional
+
+from src.domain.entities.user import User
+
+
+@dataclass(slots=True)
+class UserChange:
+    op: Literal["insert", "update", "delete"]
+    user_id: int
+    changed_at: datetime
+    user: Optional[User] = None
@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+from src.domain.entities.user_change import UserChange
+
+
+class UserChangeFeed(ABC):
+    @abstractmethod
+    def subscribe(self) -> AsyncIterator[Optional[UserChange]]:
+        # Registered on call, released by aclose(). Yields None on an idle heartbeat and
+        # stops when the subscriber falls behind or the feed disconnects.
+        pass
@@ -1,31 +1,133 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
 
 from src.domain.entities.user import User
 
 
+BatchUpdateStatus = Literal["updated", "not_found", "conflict"]
+
+
 class UserRepository(ABC):
     @abstractmethod
-    async def create(self, user: User) -> User:
+    async def create(self, user: User) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
         pass
 
     @abstractmethod
     async def get_by_id(self, user_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        pass
+
     @abstractmethod
     async def get_by_email(self, email: str) -> Optional[User]:
         pass
 
     @abstractmethod
-    async def get_all(self, limit: int = 100, offset: int = 0) -> List[User]:
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        # Only the given USER_FIELDS, in that order.
+        pass
+
+    @abstractmethod
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def count(self) -> int:
+        pass
+
+    @abstractmethod
+    async def estimate_count(self) -> int:
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        # (rank, user) ordered by (rank, id): 0 exact, 1 prefix, 2 substring.
+        pass
+
+    @abstractmethod
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        # (user_id, deleted_at) ordered by (deleted_at, user_id).
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
         pass
 
     @abstractmethod
-    async def update(self, user: User) -> Optional[User]:
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
         pass
 
     @abstractmethod
     async def delete(self, user_id: int) -> bool:
         pass
 
+    @abstractmethod
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        # Items are (id, email, name); results are aligned with the input.
+        pass
+
+    @abstractmethod
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        pass
+
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Literal, Optional
+
+from src.infrastructure import metrics
+
+
+Priority = Literal["write", "read"]
+
+# Queues are drained in this order: writes before reads.
+PRIORITIES = ("write", "read")
+
+
+class Overloaded(Exception):
+    def __init__(self, priority: Priority, reason: str):
+        super().__init__(f"Admission rejected ({priority}, {reason})")
+        self.priority = priority
+        self.reason = reason
+
+
+# AIMD concurrency limit: grows by about one per `limit` fast responses, shrinks by
+# `decrease_factor` at most once per `latency_target`. Excess requests queue by priority
+# and are rejected when the queue is full or `queue_timeout` expires.
+class AdmissionController:
+    def __init__(
+        self,
+        initial_limit: int = 64,
+        min_limit: int = 4,
+        max_limit: int = 512,
+        latency_target: float = 0.25,
+        decrease_factor: float = 0.9,
+        queue_sizes: Optional[Dict[str, int]] = None,
+        queue_timeout: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.queue_sizes = {"write": 256, "read": 128, **(queue_sizes or {})}
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.shed = 0
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._queues: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    def queue_depth(self, priority: Priority) -> int:
+        return len(self._queues[priority])
+
+    async def acquire(self, priority: Priority) -> None:
+        if self.in_flight < int(self.limit) and not any(self._queues.values()):
+            self.in_flight += 1
+            self._observe()
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_sizes[priority]:
+            self._reject(priority, "queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._observe()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(queue, waiter)
+            self._reject(priority, "timeout")
+        except asyncio.CancelledError:
+            self._discard(queue, waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted but the request was cancelled: hand it on.
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, latency: float) -> None:
+        if latency > self.latency_target:
+            now = self._clock()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and self.in_flight < int(self.limit):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._observe()
+
+    def _discard(self, queue: Deque[asyncio.Future], waiter: asyncio.Future) -> None:
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        self._observe()
+
+    def _reject(self, priority: Priority, reason: str) -> None:
+        self.shed += 1
+        metrics.observe_shed(priority, reason)
+        raise Overloaded(priority, reason)
+
+    def _observe(self) -> None:
+        metrics.observe_admission(
+            self.limit,
+            self.in_flight,
+            {priority: len(queue) for priority, queue in self._queues.items()},
+        )
@@ -1,3 +1,5 @@
+from typing import List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,9 +11,63 @@ class Settings(BaseSettings):
     database_name: str = "cleanarch_db"
     database_user: str = "postgres"
     database_password: str = "postgres"
+    database_pool_min_size: int = 1
+    database_pool_max_size: int = 20
+    database_pool_warm_up: bool = True
+    database_statement_cache_size: int = 100
+    database_max_inactive_connection_lifetime: float = 300.0
+    database_shard_dsns: List[str] = []
+    database_connection_budget: int = 0
+    database_pool_acquire_timeout: float = 10.0
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    app_workers: int = 1
+    app_loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    app_http: Literal["auto", "h11", "httptools"] = "auto"
+    app_backlog: int = 2048
+    app_keep_alive_seconds: int = 5
+    app_graceful_shutdown_seconds: int = 30
+    admission_enabled: bool = True
+    admission_initial_limit: int = 64
+    admission_min_limit: int = 4
+    admission_max_limit: int = 512
+    admission_latency_target_seconds: float = 0.25
+    admission_decrease_factor: float = 0.9
+    admission_write_queue_size: int = 256
+    admission_read_queue_size: int = 128
+    admission_queue_timeout_seconds: float = 1.0
+    admission_retry_after_seconds: int = 1
     debug: bool = False
+    user_repository_backend: Literal["postgres", "memory", "sharded"] = "postgres"
+    user_repository_snapshot_path: Optional[str] = None
+    users_batch_max_size: int = 10000
+    users_batch_write_max_size: int = 1000
+    users_export_batch_size: int = 1000
+    response_compression_min_size: int = 1024
+    response_compression_offload_size: int = 262144
+    response_gzip_level: int = 6
+    response_zstd_level: int = 3
+    users_search_min_query_length: int = 3
+    users_count_refresh_seconds: float = 60.0
+    users_changes_enabled: bool = True
+    users_changes_queue_size: int = 1000
+    users_changes_heartbeat_seconds: float = 15.0
+    user_cache_enabled: bool = False
+    user_cache_max_size: int = 10000
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_negative_ttl_seconds: float = 5.0
+    user_loader_enabled: bool = False
+    user_loader_window_us: int = 0
+    user_loader_max_batch_size: int = 500
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.1
+    slow_query_explain_interval_seconds: float = 300.0
+    slow_query_explain_timeout_ms: int = 5000
+    migration_lock_timeout_ms: int = 5000
+    migration_lock_retries: int = 3
+    migration_backfill_batch_size: int = 1000
+    migration_backfill_sleep_seconds: float = 0.1
 
 
 settings = Settings()
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Backfill:
+    # `update` runs once per chunk with bounds $1 < key <= $2.
+    table: str
+    update: str
+    key: str = "id"
+    batch_size: Optional[int] = None
+    sleep_seconds: Optional[float] = None
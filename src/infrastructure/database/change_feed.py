@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Set
+
+import asyncpg
+
+from src.domain.entities.user import User
+from src.domain.entities.user_change import UserChange
+from src.domain.repositories.user_change_feed import UserChangeFeed
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "users_changes"
+
+_CLOSED = object()
+
+
+def parse_notification(payload: str) -> UserChange:
+    data = json.loads(payload)
+    user = None
+    if data["op"] != "delete":
+        user = User(
+            id=data["id"],
+            email=data["email"],
+            name=data["name"],
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+            updated_at=datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None,
+        )
+    return UserChange(
+        op=data["op"],
+        user_id=data["id"],
+        changed_at=datetime.fromisoformat(data["changed_at"]),
+        user=user,
+    )
+
+
+class Subscription:
+    def __init__(self, feed: "PostgresUserChangeFeed", queue_size: int, heartbeat: float):
+        self._feed = feed
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._heartbeat = heartbeat
+        self.closed = False
+
+    def publish(self, change: UserChange) -> bool:
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(change)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # The client reconnects with Last-Event-ID and catches up from the table.
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_CLOSED)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Optional[UserChange]:
+        try:
+            change = await asyncio.wait_for(self._queue.get(), timeout=self._heartbeat)
+        except asyncio.TimeoutError:
+            return None
+        if change is _CLOSED:
+            self._feed.unsubscribe(self)
+            raise StopAsyncIteration
+        return change
+
+    async def aclose(self) -> None:
+        self._feed.unsubscribe(self)
+        self.close()
+
+
+# One LISTEN connection per database or shard, fanned out to this worker's subscribers.
+class PostgresUserChangeFeed(UserChangeFeed):
+    def __init__(
+        self,
+        sources: List[dict],
+        queue_size: int = 1000,
+        heartbeat: float = 15.0,
+        reconnect_delay: float = 1.0,
+    ):
+        self.sources = sources
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: Set[Subscription] = set()
+        self._connections: List[Optional[asyncpg.Connection]] = [None] * len(sources)
+        self._reconnects: Set[asyncio.Task] = set()
+        self._stopped = False
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._stopped = False
+        await asyncio.gather(*(self._listen(index) for index in range(len(self.sources))))
+
+    async def _listen(self, index: int) -> None:
+        connection = await asyncpg.connect(**self.sources[index])
+        connection.add_termination_listener(lambda _: self._on_terminated(index))
+        await connection.add_listener(CHANNEL, self._on_notification)
+        self._connections[index] = connection
+
+    def _on_terminated(self, index: int) -> None:
+        self._connections[index] = None
+        if self._stopped:
+            return
+        # Events are lost while disconnected: close subscriptions so clients catch up.
+        self._close_subscribers()
+        task = asyncio.get_running_loop().create_task(self._reconnect(index))
+        self._reconnects.add(task)
+        task.add_done_callback(self._reconnects.discard)
+
+    async def _reconnect(self, index: int) -> None:
+        while not self._stopped:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._listen(index)
+                return
+            except (OSError, asyncpg.PostgresError):
+                logger.warning("Change feed listener reconnect failed", exc_info=True)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            change = parse_notification(payload)
+        except (ValueError, KeyError):
+            logger.warning("Malformed change notification: %s", payload)
+            return
+        for subscription in list(self._subscribers):
+            if not subscription.publish(change):
+                self._subscribers.discard(subscription)
+                self.dropped += 1
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, queue_size=self.queue_size, heartbeat=self.heartbeat)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def _close_subscribers(self) -> None:
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    async def stop(self) -> None:
+        self._stopped = True
+        for task in list(self._reconnects):
+            task.cancel()
+        self._close_subscribers()
+        connections = [connection for connection in self._connections if connection]
+        self._connections = [None] * len(self.sources)
+        await asyncio.gather(*(connection.close() for connection in connections))
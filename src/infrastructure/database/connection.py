@@ -1,44 +1,144 @@
+import asyncio
+import json
+import time
 import asyncpg
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, Optional, Sequence, Union
 
+from src.infrastructure import metrics
 from src.infrastructure.config import settings
+from src.infrastructure.database.slow_query_log import SlowQueryLog
+from src.infrastructure.database.statements import Statement, StatementRegistry, statement_registry
+
+
+Query = Union[str, Statement]
 
 
 class DatabaseConnection:
-    def __init__(self):
+    def __init__(
+        self,
+        statements: StatementRegistry = statement_registry,
+        dsn: Optional[str] = None,
+    ):
         self.pool: Optional[asyncpg.Pool] = None
-    
+        self.statements = statements
+        self.dsn = dsn
+        self.slow_query_log: Optional[SlowQueryLog] = None
+
+    def connect_kwargs(self) -> dict:
+        if self.dsn:
+            return {"dsn": self.dsn}
+        return {
+            "host": settings.database_host,
+            "port": settings.database_port,
+            "database": settings.database_name,
+            "user": settings.database_user,
+            "password": settings.database_password,
+        }
+
     async def connect(self):
         if not self.pool:
             self.pool = await asyncpg.create_pool(
-                host=settings.database_host,
-                port=settings.database_port,
-                database=settings.database_name,
-                user=settings.database_user,
-                password=settings.database_password,
-                min_size=1,
-                max_size=20,
+                **self.connect_kwargs(),
+                min_size=settings.database_pool_min_size,
+                max_size=settings.database_pool_max_size,
+                max_inactive_connection_lifetime=settings.database_max_inactive_connection_lifetime,
+                statement_cache_size=settings.database_statement_cache_size,
+                init=self._init_connection,
                 timeout=30.0,
                 command_timeout=60.0,
             )
-    
+
+    async def warm_up(self):
+        size = min(settings.database_pool_min_size, settings.database_pool_max_size)
+        connections = []
+        try:
+            # Held until the end so each acquire opens a new connection.
+            for _ in range(size):
+                connections.append(await self.pool.acquire(timeout=30.0))
+            await asyncio.gather(*(connection.fetchval("select 1") for connection in connections))
+        finally:
+            for connection in connections:
+                await self.pool.release(connection)
+
     async def disconnect(self):
         if self.pool:
             await self.pool.close()
             self.pool = None
-    
-    async def execute(self, query: str, *args):
-        async with self.pool.acquire(timeout=10.0) as connection:
-            return await connection.execute(query, *args)
-    
-    async def fetch(self, query: str, *args):
-        async with self.pool.acquire(timeout=10.0) as connection:
-            return await connection.fetch(query, *args)
-    
-    async def fetchrow(self, query: str, *args):
-        async with self.pool.acquire(timeout=10.0) as connection:
-            return await connection.fetchrow(query, *args)
 
+    async def _init_connection(self, connection: asyncpg.Connection):
+        if settings.database_statement_cache_size <= 0:
+            return
+        for statement in self.statements:
+            await connection.executemany(statement.sql, [])
 
-db_connection = DatabaseConnection()
+    def _sql(self, query: Query) -> str:
+        return query.sql if isinstance(query, Statement) else query
+
+    def _label(self, query: Query) -> str:
+        return query.name if isinstance(query, Statement) else "raw"
+
+    @asynccontextmanager
+    async def _acquire(self):
+        started = time.perf_counter()
+        async with self.pool.acquire(timeout=settings.database_pool_acquire_timeout) as connection:
+            metrics.observe_pool_acquire(self.pool, time.perf_counter() - started)
+            yield connection
+
+    async def _run(self, operation: str, query: Query, args: Sequence[Any]):
+        started = time.perf_counter()
+        async with self._acquire() as connection:
+            acquired = time.perf_counter()
+            with metrics.track_query(self._label(query), operation):
+                result = await getattr(connection, operation)(self._sql(query), *args)
+            finished = time.perf_counter()
+        if self.slow_query_log is not None:
+            self.slow_query_log.observe(
+                self._label(query),
+                self._sql(query),
+                args,
+                duration=finished - acquired,
+                pool_wait=acquired - started,
+                explain=self.explain,
+            )
+        return result
+
+    async def execute(self, query: Query, *args):
+        return await self._run("execute", query, args)
+
+    async def fetch(self, query: Query, *args):
+        return await self._run("fetch", query, args)
+
+    async def fetchrow(self, query: Query, *args):
+        return await self._run("fetchrow", query, args)
+
+    async def fetchval(self, query: Query, *args):
+        return await self._run("fetchval", query, args)
 
+    async def explain(self, sql: str, args: Sequence[Any], analyze: bool) -> Any:
+        # A dedicated connection so plans never take pool slots from requests;
+        # pool_sizing reserves it in the per-worker budget.
+        connection = await asyncpg.connect(**self.connect_kwargs())
+        try:
+            await connection.execute(
+                f"set statement_timeout = {int(settings.slow_query_explain_timeout_ms)}"
+            )
+            options = "analyze, buffers, format json" if analyze else "format json"
+            transaction = connection.transaction(readonly=analyze)
+            await transaction.start()
+            try:
+                plan = await connection.fetchval(f"explain ({options}) {sql}", *args)
+            finally:
+                await transaction.rollback()
+        finally:
+            await connection.close()
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    async def iterate(self, query: Query, *args, prefetch: int = 1000):
+        async with self._acquire() as connection:
+            async with connection.transaction(isolation="repeatable_read", readonly=True):
+                async for record in connection.cursor(self._sql(query), *args, prefetch=prefetch):
+                    yield record
+
+
+db_connection = DatabaseConnection()
@@ -1,118 +1,383 @@
 import asyncio
+import importlib.util
+import re
 import asyncpg
 from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
 from src.infrastructure.config import settings
+from src.infrastructure.database.backfill import Backfill
+
+
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+_CONCURRENT_INDEX = re.compile(
+    r"create\s+(?:unique\s+)?index\s+concurrently\s+(?:if\s+not\s+exists\s+)?([\w.\"]+)",
+    re.IGNORECASE,
+)
+
+
+def _block_comment_end(sql: str, start: int) -> int:
+    depth = 0
+    i = start
+    while i < len(sql):
+        if sql.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif sql.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return len(sql)
+
+
+def _dollar_quote_end(sql: str, start: int) -> int:
+    if start > 0 and (sql[start - 1].isalnum() or sql[start - 1] in "_$"):
+        return -1
+    match = _DOLLAR_TAG.match(sql, start)
+    if not match:
+        return -1
+    tag = match.group()
+    end = sql.find(tag, match.end())
+    return len(sql) if end == -1 else end + len(tag)
+
+
+def split_statements(sql: str) -> List[str]:
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+            current.append(char)
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif sql.startswith("/*", i):
+            i = _block_comment_end(sql, i)
+            continue
+        elif char == "$" and _dollar_quote_end(sql, i) != -1:
+            end = _dollar_quote_end(sql, i)
+            current.append(sql[i:end])
+            i = end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def concurrent_index_name(statement: str) -> Optional[str]:
+    match = _CONCURRENT_INDEX.match(statement.strip())
+    return match.group(1) if match else None
+
+
+def is_non_transactional(sql: str) -> bool:
+    for line in sql.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("--"):
+            return False
+        if line.replace(" ", "") == NO_TRANSACTION_MARKER.replace(" ", ""):
+            return True
+    return False
 
 
 class MigrationRunner:
-    def __init__(self, migrations_dir: str = "src/infrastructure/database/migrations"):
+    def __init__(
+        self,
+        migrations_dir: str = "src/infrastructure/database/migrations",
+        lock_timeout_ms: Optional[int] = None,
+        lock_retries: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        sleep_seconds: Optional[float] = None,
+        dsn: Optional[str] = None,
+    ):
+        self.dsn = dsn
         self.migrations_dir = Path(migrations_dir)
         self.migrations_dir.mkdir(parents=True, exist_ok=True)
-    
+        self.lock_timeout_ms = (
+            settings.migration_lock_timeout_ms if lock_timeout_ms is None else lock_timeout_ms
+        )
+        self.lock_retries = settings.migration_lock_retries if lock_retries is None else lock_retries
+        self.batch_size = batch_size or settings.migration_backfill_batch_size
+        self.sleep_seconds = (
+            settings.migration_backfill_sleep_seconds if sleep_seconds is None else sleep_seconds
+        )
+
+    async def _connect(self):
+        if self.dsn:
+            conn = await asyncpg.connect(dsn=self.dsn)
+        else:
+            conn = await asyncpg.connect(
+                host=settings.database_host,
+                port=settings.database_port,
+                database=settings.database_name,
+                user=settings.database_user,
+                password=settings.database_password,
+            )
+        await conn.execute(f"set lock_timeout = {int(self.lock_timeout_ms)}")
+        return conn
+
     async def _ensure_migrations_table(self, conn):
         await conn.execute("""
             create table if not exists schema_migrations (
                 version varchar(255) primary key,
                 applied_at timestamp default current_timestamp
-            )
+            );
+            alter table schema_migrations add column if not exists checkpoint bigint;
+            alter table schema_migrations
+                add column if not exists rows_processed bigint not null default 0;
         """)
-    
+
     async def _get_applied_migrations(self, conn):
-        rows = await conn.fetch("select version from schema_migrations order by version")
+        rows = await conn.fetch(
+            "select version from schema_migrations where applied_at is not null order by version"
+        )
         return {row['version'] for row in rows}
-    
+
+    def _get_migration_files(self) -> Dict[str, Path]:
+        files: Dict[str, Path] = {}
+        for path in [*self.migrations_dir.glob("*.sql"), *self.migrations_dir.glob("*.py")]:
+            if path.name.startswith("_"):
+                continue
+            if path.stem in files:
+                raise ValueError(f"Duplicate migration version: {path.stem}")
+            files[path.stem] = path
+        return dict(sorted(files.items()))
+
     async def _get_pending_migrations(self, conn):
         applied = await self._get_applied_migrations(conn)
-        all_migrations = sorted([
-            f.stem for f in self.migrations_dir.glob("*.sql")
-        ])
-        return [m for m in all_migrations if m not in applied]
-    
-    async def migrate(self):
-        conn = await asyncpg.connect(
-            host=settings.database_host,
-            port=settings.database_port,
-            database=settings.database_name,
-            user=settings.database_user,
-            password=settings.database_password,
+        return [m for m in self._get_migration_files() if m not in applied]
+
+    async def _with_lock_retries(self, operation: Callable[[], Awaitable[None]]) -> None:
+        for attempt in range(self.lock_retries + 1):
+            try:
+                await operation()
+                return
+            except asyncpg.LockNotAvailableError:
+                if attempt == self.lock_retries:
+                    raise
+                print(f"   ⏳ lock_timeout, retry {attempt + 1}/{self.lock_retries}")
+                await asyncio.sleep(attempt + 1)
+
+    async def _mark_applied(self, conn, migration_name: str) -> None:
+        await conn.execute(
+            """
+            insert into schema_migrations (version, applied_at) values ($1, current_timestamp)
+            on conflict (version) do update set applied_at = excluded.applied_at
+            """,
+            migration_name,
+        )
+
+    async def _apply_sql(self, conn, migration_name: str, sql: str) -> None:
+        async def apply():
+            async with conn.transaction():
+                await conn.execute(sql)
+                await self._mark_applied(conn, migration_name)
+
+        await self._with_lock_retries(apply)
+
+    async def _drop_invalid_index(self, conn, index: str) -> None:
+        invalid = await conn.fetchval(
+            "select not indisvalid from pg_index where indexrelid = to_regclass($1)", index
+        )
+        if invalid:
+            print(f"   🧹 dropping invalid index {index}")
+            await conn.execute(f"drop index concurrently if exists {index}")
+
+    async def _apply_non_transactional(self, conn, migration_name: str, sql: str) -> None:
+        # Commands like create index concurrently must run one per query, outside a transaction.
+        for statement in split_statements(sql):
+            index = concurrent_index_name(statement)
+
+            async def apply(statement=statement, index=index):
+                # A failed concurrent build leaves an INVALID index that `if not exists` would skip.
+                if index:
+                    await self._drop_invalid_index(conn, index)
+                try:
+                    await conn.execute(statement)
+                except Exception:
+                    if index:
+                        await self._drop_invalid_index(conn, index)
+                    raise
+
+            await self._with_lock_retries(apply)
+        await self._mark_applied(conn, migration_name)
+
+    def _load_backfill(self, path: Path) -> Backfill:
+        spec = importlib.util.spec_from_file_location(f"migrations.{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        backfill = getattr(module, "BACKFILL", None)
+        if not isinstance(backfill, Backfill):
+            raise ValueError(f"{path.name} must define BACKFILL = Backfill(...)")
+        return backfill
+
+    async def _apply_backfill(self, conn, migration_name: str, backfill: Backfill) -> None:
+        batch_size = backfill.batch_size or self.batch_size
+        sleep_seconds = (
+            self.sleep_seconds if backfill.sleep_seconds is None else backfill.sleep_seconds
         )
-        
+        progress = await conn.fetchrow(
+            """
+            insert into schema_migrations (version, applied_at) values ($1, null)
+            on conflict (version) do update set version = excluded.version
+            returning checkpoint, rows_processed
+            """,
+            migration_name,
+        )
+        checkpoint = progress["checkpoint"]
+        rows_processed = progress["rows_processed"]
+        if checkpoint is None:
+            first_key = await conn.fetchval(f"select min({backfill.key}) from {backfill.table}")
+            checkpoint = first_key - 1 if first_key is not None else None
+        else:
+            print(f"   ↻ resuming after {backfill.key}={checkpoint} ({rows_processed} rows done)")
+
+        chunk_end_sql = f"""
+            select max({backfill.key}) from (
+                select {backfill.key} from {backfill.table}
+                where {backfill.key} > $1 order by {backfill.key} limit $2
+            ) chunk
+        """
+        while checkpoint is not None:
+            upper = await conn.fetchval(chunk_end_sql, checkpoint, batch_size)
+            if upper is None:
+                break
+            lower = checkpoint
+            rows = 0
+
+            async def apply_chunk():
+                nonlocal rows
+                async with conn.transaction():
+                    count = (await conn.execute(backfill.update, lower, upper)).split()[-1]
+                    rows = int(count) if count.isdigit() else 0
+                    await conn.execute(
+                        """
+                        update schema_migrations
+                        set checkpoint = $2, rows_processed = rows_processed + $3
+                        where version = $1
+                        """,
+                        migration_name,
+                        upper,
+                        rows,
+                    )
+
+            await self._with_lock_retries(apply_chunk)
+            checkpoint = upper
+            rows_processed += rows
+            print(f"   … {backfill.table}: {backfill.key}<={upper}, {rows_processed} rows")
+            if sleep_seconds:
+                await asyncio.sleep(sleep_seconds)
+
+        await self._mark_applied(conn, migration_name)
+
+    async def _apply(self, conn, migration_name: str, path: Path) -> None:
+        if path.suffix == ".py":
+            await self._apply_backfill(conn, migration_name, self._load_backfill(path))
+            return
+        sql = path.read_text()
+        if is_non_transactional(sql):
+            await self._apply_non_transactional(conn, migration_name, sql)
+        else:
+            await self._apply_sql(conn, migration_name, sql)
+
+    async def migrate(self):
+        conn = await self._connect()
+
         try:
             await self._ensure_migrations_table(conn)
+            files = self._get_migration_files()
             pending = await self._get_pending_migrations(conn)
-            
+
             if not pending:
                 print("No pending migrations")
                 return
-            
+
             for migration_name in pending:
                 print(f"Applying migration: {migration_name}")
-                
-                migration_file = self.migrations_dir / f"{migration_name}.sql"
-                sql = migration_file.read_text()
-                
-                async with conn.transaction():
-                    await conn.execute(sql)
-                    await conn.execute(
-                        "insert into schema_migrations (version) values ($1)",
-                        migration_name
-                    )
-                
+                await self._apply(conn, migration_name, files[migration_name])
                 print(f"✅ Applied: {migration_name}")
-            
+
             print(f"\n✅ Successfully applied {len(pending)} migration(s)")
-        
+
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
         finally:
             await conn.close()
-    
+
     async def status(self):
-        conn = await asyncpg.connect(
-            host=settings.database_host,
-            port=settings.database_port,
-            database=settings.database_name,
-            user=settings.database_user,
-            password=settings.database_password,
-        )
-        
+        conn = await self._connect()
+
         try:
             await self._ensure_migrations_table(conn)
             applied = await self._get_applied_migrations(conn)
-            all_migrations = sorted([
-                f.stem for f in self.migrations_dir.glob("*.sql")
-            ])
-            
+            in_progress = {
+                row["version"]: row
+                for row in await conn.fetch(
+                    "select version, checkpoint, rows_processed from schema_migrations "
+                    "where applied_at is null"
+                )
+            }
+            all_migrations = list(self._get_migration_files())
+
             if not all_migrations:
                 print("\n⚠️  No migration files found")
                 print(f"Create SQL files in: {self.migrations_dir}")
                 return
-            
+
             print("\nMigration Status:")
             print("-" * 70)
             for migration in all_migrations:
-                status = "✅ Applied" if migration in applied else "⏳ Pending"
+                if migration in applied:
+                    status = "✅ Applied"
+                elif migration in in_progress:
+                    row = in_progress[migration]
+                    status = f"🔄 In progress ({row['rows_processed']} rows)"
+                else:
+                    status = "⏳ Pending"
                 print(f"{migration:<55} {status}")
             print("-" * 70)
-            
+
             pending_count = len([m for m in all_migrations if m not in applied])
             print(f"\nTotal: {len(all_migrations)} | Applied: {len(applied)} | Pending: {pending_count}")
-        
+
         finally:
             await conn.close()
 
 
 async def main():
     import sys
-    runner = MigrationRunner()
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "status":
-        await runner.status()
-    else:
-        await runner.migrate()
+    runners = [MigrationRunner()]
+    if settings.user_repository_backend == "sharded":
+        runners = [MigrationRunner(dsn=dsn) for dsn in settings.database_shard_dsns]
+
+    for index, runner in enumerate(runners):
+        if runner.dsn:
+            print(f"\n=== Shard {index}")
+        if len(sys.argv) > 1 and sys.argv[1] == "status":
+            await runner.status()
+        else:
+            await runner.migrate()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-
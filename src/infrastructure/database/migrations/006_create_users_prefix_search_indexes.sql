@@ -0,0 +1,3 @@
+-- migrate:no-transaction
+create index concurrently if not exists idx_users_email_prefix on users(email text_pattern_ops);
+create index concurrently if not exists idx_users_name_prefix on users(lower(name) text_pattern_ops);
@@ -0,0 +1,2 @@
+-- pg_trgm ships with postgres contrib; without it substring search cannot use an index.
+create extension if not exists pg_trgm;
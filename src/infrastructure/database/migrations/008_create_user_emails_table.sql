@@ -0,0 +1,5 @@
+-- email -> user_id index for the sharded backend, stored on the shard of the email hash.
+create table if not exists user_emails (
+    email varchar(255) primary key,
+    user_id integer not null
+);
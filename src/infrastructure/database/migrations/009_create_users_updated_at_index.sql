@@ -0,0 +1,2 @@
+-- migrate:no-transaction
+create index concurrently if not exists idx_users_updated_at_id on users(updated_at, id);
@@ -0,0 +1,29 @@
+-- Change events for GET /users/changes; only user columns fit the 8000-byte payload limit.
+create or replace function notify_users_change() returns trigger as $$
+begin
+    if tg_op = 'DELETE' then
+        perform pg_notify('users_changes', json_build_object(
+            'op', 'delete',
+            'id', old.id,
+            'changed_at', current_timestamp::timestamp
+        )::text);
+        return old;
+    end if;
+
+    perform pg_notify('users_changes', json_build_object(
+        'op', lower(tg_op),
+        'id', new.id,
+        'email', new.email,
+        'name', new.name,
+        'created_at', new.created_at,
+        'updated_at', new.updated_at,
+        'changed_at', coalesce(new.updated_at, current_timestamp::timestamp)
+    )::text);
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists users_change_notify on users;
+create trigger users_change_notify
+    after insert or update or delete on users
+    for each row execute function notify_users_change();
@@ -0,0 +1,3 @@
+-- migrate:no-transaction
+create index concurrently if not exists idx_users_email_trgm on users using gin (email gin_trgm_ops);
+create index concurrently if not exists idx_users_name_trgm on users using gin (lower(name) gin_trgm_ops);
@@ -0,0 +1,3 @@
+-- Lets the email index reconciler skip reservations of updates still in flight.
+alter table user_emails
+    add column if not exists reserved_at timestamp not null default current_timestamp;
@@ -0,0 +1,22 @@
+-- Deleted users for GET /users/changes catch-up, since deletes leave nothing in users.
+create table if not exists user_tombstones (
+    user_id integer primary key,
+    deleted_at timestamp not null default current_timestamp
+);
+
+create index if not exists idx_user_tombstones_deleted_at_id
+    on user_tombstones(deleted_at, user_id);
+
+create or replace function record_user_tombstone() returns trigger as $$
+begin
+    insert into user_tombstones (user_id, deleted_at)
+    values (old.id, current_timestamp)
+    on conflict (user_id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$ language plpgsql;
+
+drop trigger if exists users_tombstone on users;
+create trigger users_tombstone
+    after delete on users
+    for each row execute function record_user_tombstone();
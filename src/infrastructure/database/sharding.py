@@ -0,0 +1,34 @@
+import asyncio
+import zlib
+from typing import List
+
+from src.infrastructure.database.connection import DatabaseConnection
+
+
+class ShardMap:
+    def __init__(self, shards: List[DatabaseConnection]):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = shards
+
+    @classmethod
+    def from_dsns(cls, dsns: List[str]) -> "ShardMap":
+        return cls([DatabaseConnection(dsn=dsn) for dsn in dsns])
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def index_for_id(self, user_id: int) -> int:
+        return (user_id - 1) % len(self.shards)
+
+    def index_for_email(self, email: str) -> int:
+        return zlib.crc32(email.encode()) % len(self.shards)
+
+    async def connect(self) -> None:
+        await asyncio.gather(*(shard.connect() for shard in self.shards))
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(shard.warm_up() for shard in self.shards))
+
+    async def disconnect(self) -> None:
+        await asyncio.gather(*(shard.disconnect() for shard in self.shards))
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Set
+
+
+logger = logging.getLogger(__name__)
+
+Explain = Callable[[str, Sequence[Any], bool], Awaitable[Any]]
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_WRITES = re.compile(r"\b(insert|update|delete|merge)\b")
+
+
+def normalize_sql(sql: str) -> str:
+    return _WHITESPACE.sub(" ", _LITERALS.sub("?", sql)).strip().lower()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.blake2b(normalized_sql.encode(), digest_size=8).hexdigest()
+
+
+def is_write(normalized_sql: str) -> bool:
+    return _WRITES.search(normalized_sql) is not None
+
+
+def scrub_plan(plan: Any) -> Any:
+    # Postgres inlines bound parameters into conditions (`email = 'alice@...'`).
+    if isinstance(plan, dict):
+        return {key: scrub_plan(value) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [scrub_plan(value) for value in plan]
+    if isinstance(plan, str):
+        return _LITERALS.sub("?", plan)
+    return plan
+
+
+@dataclass
+class SlowQueryStats:
+    fingerprint: str
+    statement: str
+    query: str
+    param_types: List[str]
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    pool_wait_ms: float = 0.0
+    last_seen: float = 0.0
+    plan: Optional[Any] = None
+    plan_captured_at: Optional[float] = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "mean_ms": self.mean_ms}
+
+
+class SlowQueryLog:
+    """Per-process log of queries over the threshold, with sampled plans.
+
+    At most one EXPLAIN runs at a time, once per `explain_interval` per fingerprint.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.2,
+        sample_rate: float = 0.1,
+        explain_interval: float = 300.0,
+        max_statements: int = 500,
+        clock: Callable[[], float] = time.time,
+        sample: Callable[[], float] = random.random,
+    ):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.explain_interval = explain_interval
+        self.max_statements = max_statements
+        self._clock = clock
+        self._sample = sample
+        self._stats: Dict[str, SlowQueryStats] = {}
+        self._explained_at: Dict[str, float] = {}
+        self._explains: Set[asyncio.Task] = set()
+
+    def observe(
+        self,
+        statement: str,
+        sql: str,
+        args: Sequence[Any],
+        duration: float,
+        pool_wait: float,
+        explain: Optional[Explain] = None,
+    ) -> None:
+        if duration < self.threshold:
+            return
+        query = normalize_sql(sql)
+        key = fingerprint(query)
+        now = self._clock()
+        # Parameter values may hold personal data; only their types are kept.
+        param_types = [type(arg).__name__ for arg in args]
+
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_statements:
+                coldest = min(self._stats.values(), key=lambda item: item.total_ms)
+                del self._stats[coldest.fingerprint]
+            stats = self._stats[key] = SlowQueryStats(key, statement, query, param_types)
+        stats.calls += 1
+        stats.total_ms += duration * 1000
+        stats.max_ms = max(stats.max_ms, duration * 1000)
+        stats.pool_wait_ms += pool_wait * 1000
+        stats.last_seen = now
+
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "fingerprint": key,
+            "statement": statement,
+            "query": query,
+            "param_types": param_types,
+            "duration_ms": round(duration * 1000, 3),
+            "pool_wait_ms": round(pool_wait * 1000, 3),
+        }))
+
+        if explain is not None and self._should_explain(key, now):
+            self._explained_at[key] = now
+            task = asyncio.get_running_loop().create_task(
+                self._capture_plan(stats, sql, list(args), explain)
+            )
+            self._explains.add(task)
+            task.add_done_callback(self._explains.discard)
+
+    def _should_explain(self, key: str, now: float) -> bool:
+        if self._explains or self._sample() >= self.sample_rate:
+            return False
+        return now - self._explained_at.get(key, float("-inf")) >= self.explain_interval
+
+    async def _capture_plan(
+        self,
+        stats: SlowQueryStats,
+        sql: str,
+        args: List[Any],
+        explain: Explain,
+    ) -> None:
+        analyze = not is_write(stats.query)
+        try:
+            plan = scrub_plan(await explain(sql, args, analyze))
+        except Exception:
+            logger.warning("Failed to capture plan for %s", stats.fingerprint, exc_info=True)
+            return
+        stats.plan = plan
+        stats.plan_captured_at = self._clock()
+        logger.warning(json.dumps({
+            "event": "slow_query_plan",
+            "fingerprint": stats.fingerprint,
+            "statement": stats.statement,
+            "analyze": analyze,
+            "plan": plan,
+        }))
+
+    def top(
+        self,
+        limit: int = 20,
+        order_by: Literal["total_ms", "max_ms", "mean_ms", "calls"] = "total_ms",
+    ) -> List[SlowQueryStats]:
+        return sorted(
+            self._stats.values(), key=lambda stats: getattr(stats, order_by), reverse=True
+        )[:limit]
+
+    async def stop(self) -> None:
+        for task in list(self._explains):
+            task.cancel()
+        await asyncio.gather(*self._explains, return_exceptions=True)
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+
+
+class StatementRegistry:
+    def __init__(self):
+        self._statements: Dict[str, Statement] = {}
+
+    def register(self, name: str, sql: str) -> Statement:
+        existing = self._statements.get(name)
+        if existing and existing.sql != sql:
+            raise ValueError(f"Statement {name} is already registered with different SQL")
+        statement = Statement(name=name, sql=sql)
+        self._statements[name] = statement
+        return statement
+
+    def __iter__(self) -> Iterator[Statement]:
+        return iter(list(self._statements.values()))
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+statement_registry = StatementRegistry()
@@ -0,0 +1,139 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+MULTIPROCESS_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database query latency by statement name",
+    ["statement", "operation"],
+    buckets=DB_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Failed database queries by statement name and error type",
+    ["statement", "operation", "error"],
+)
+DB_POOL_ACQUIRE_DURATION = Histogram(
+    "db_pool_acquire_duration_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=DB_BUCKETS,
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Open connections in the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_IDLE = Gauge(
+    "db_pool_idle_connections",
+    "Idle connections in the pool",
+    multiprocess_mode="livesum",
+)
+APP_STARTUP_DURATION = Gauge(
+    "app_startup_seconds",
+    "Time spent building the application container and opening resources",
+    multiprocess_mode="max",
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive limit of concurrently admitted requests",
+    multiprocess_mode="livesum",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests",
+    "Requests admitted and not yet finished",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission by priority",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 by priority and reason",
+    ["priority", "reason"],
+)
+
+
+def observe_request(method: str, route: str, status: int, duration: float) -> None:
+    HTTP_REQUESTS.labels(method, route, str(status)).inc()
+    HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+
+
+def observe_startup(duration: float) -> None:
+    APP_STARTUP_DURATION.set(duration)
+
+
+def observe_admission(limit: float, in_flight: int, queue_depths: Dict[str, int]) -> None:
+    ADMISSION_LIMIT.set(limit)
+    ADMISSION_IN_FLIGHT.set(in_flight)
+    for priority, depth in queue_depths.items():
+        ADMISSION_QUEUE_DEPTH.labels(priority).set(depth)
+
+
+def observe_shed(priority: str, reason: str) -> None:
+    ADMISSION_SHED.labels(priority, reason).inc()
+
+
+def observe_pool(pool) -> None:
+    DB_POOL_SIZE.set(pool.get_size())
+    DB_POOL_IDLE.set(pool.get_idle_size())
+
+
+def observe_pool_acquire(pool, duration: float) -> None:
+    DB_POOL_ACQUIRE_DURATION.observe(duration)
+    observe_pool(pool)
+
+
+@contextmanager
+def track_query(statement: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        DB_QUERY_ERRORS.labels(statement, operation, type(e).__name__).inc()
+        raise
+    finally:
+        DB_QUERY_DURATION.labels(statement, operation).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROCESS_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    if MULTIPROCESS_ENV in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,138 @@
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.domain.entities.user import User
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
+from src.infrastructure.dataloader import DataLoader
+
+
+class BatchingUserRepository(UserRepository):
+    def __init__(
+        self,
+        repository: UserRepository,
+        window: float = 0.0,
+        max_batch_size: int = 500,
+    ):
+        self.repository = repository
+        self._by_id: DataLoader[int, User] = DataLoader(
+            self._load_by_ids, window=window, max_batch_size=max_batch_size
+        )
+        self._by_email: DataLoader[str, User] = DataLoader(
+            self._load_by_emails, window=window, max_batch_size=max_batch_size
+        )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"by_id": self._by_id.stats(), "by_email": self._by_email.stats()}
+
+    async def _load_by_ids(self, user_ids: List[int]) -> Dict[int, User]:
+        return {user.id: user for user in await self.repository.get_by_ids(user_ids)}
+
+    async def _load_by_emails(self, emails: List[str]) -> Dict[str, User]:
+        return {user.email: user for user in await self.repository.get_by_emails(emails)}
+
+    async def create(self, user: User) -> Optional[User]:
+        return await self.repository.create(user)
+
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
+        return await self.repository.create_many(users)
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        user = await self._by_id.load(user_id)
+        return replace(user) if user else None
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        user = await self._by_email.load(email.lower())
+        return replace(user) if user else None
+
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        return await self.repository.get_version(user_id)
+
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        return await self.repository.get_by_ids(user_ids)
+
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        return await self.repository.get_by_emails(emails)
+
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        return await self.repository.get_all(
+            limit=limit, offset=offset, after_id=after_id, descending=descending
+        )
+
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        return await self.repository.get_projection(user_id, fields)
+
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return await self.repository.get_all_projected(
+            fields, limit=limit, offset=offset, after_id=after_id, descending=descending
+        )
+
+    async def count(self) -> int:
+        return await self.repository.count()
+
+    async def estimate_count(self) -> int:
+        return await self.repository.estimate_count()
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        return await self.repository.search(query, limit=limit, prefix=prefix, after=after)
+
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        return await self.repository.get_updated_since(since, after_id=after_id, limit=limit)
+
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        return await self.repository.get_deleted_since(since, after_id=after_id, limit=limit)
+
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        return self.repository.iter_all(batch_size=batch_size)
+
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        return await self.repository.update(
+            user_id, email=email, name=name, expected_updated_at=expected_updated_at
+        )
+
+    async def delete(self, user_id: int) -> bool:
+        return await self.repository.delete(user_id)
+
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        return await self.repository.update_many(updates)
+
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        return await self.repository.delete_many(user_ids)
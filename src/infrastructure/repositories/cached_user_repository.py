@@ -0,0 +1,205 @@
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.domain.entities.user import User
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
+from src.infrastructure.cache import TTLCache
+
+
+_MISSING = object()
+_NOT_FOUND = object()
+
+
+class CachedUserRepository(UserRepository):
+    def __init__(
+        self,
+        repository: UserRepository,
+        max_size: int = 10000,
+        ttl: float = 30.0,
+        negative_ttl: float = 5.0,
+    ):
+        self.repository = repository
+        self.negative_ttl = negative_ttl
+        self._by_id = TTLCache(max_size=max_size, ttl=ttl)
+        self._by_email = TTLCache(max_size=max_size, ttl=ttl)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"by_id": self._by_id.stats(), "by_email": self._by_email.stats()}
+
+    def _remember(self, user: User) -> None:
+        self._by_id.set(user.id, replace(user))
+        self._by_email.set(user.email, user.id)
+
+    def _forget(self, user_id: int) -> None:
+        cached = self._by_id.pop(user_id)
+        if isinstance(cached, User):
+            self._by_email.pop(cached.email)
+
+    async def create(self, user: User) -> Optional[User]:
+        created = await self.repository.create(user)
+        if created:
+            self._remember(created)
+        return created
+
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
+        created_users = await self.repository.create_many(users)
+        for user in created_users:
+            if user:
+                self._remember(user)
+        return created_users
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        cached = self._by_id.get(user_id, _MISSING)
+        if cached is _NOT_FOUND:
+            return None
+        if cached is not _MISSING:
+            return replace(cached)
+
+        user = await self.repository.get_by_id(user_id)
+        if user:
+            self._remember(user)
+        else:
+            self._by_id.set(user_id, _NOT_FOUND, ttl=self.negative_ttl)
+        return user
+
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        cached = self._by_id.get(user_id, _MISSING)
+        if cached is _NOT_FOUND:
+            return None
+        if cached is not _MISSING:
+            return cached.updated_at or datetime(1970, 1, 1)
+        return await self.repository.get_version(user_id)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        email = email.lower()
+        cached_id = self._by_email.get(email, _MISSING)
+        if cached_id is _NOT_FOUND:
+            return None
+        if cached_id is not _MISSING:
+            cached = self._by_id.get(cached_id)
+            if isinstance(cached, User) and cached.email == email:
+                return replace(cached)
+
+        user = await self.repository.get_by_email(email)
+        if user:
+            self._remember(user)
+        else:
+            self._by_email.set(email, _NOT_FOUND, ttl=self.negative_ttl)
+        return user
+
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        users = await self.repository.get_by_ids(user_ids)
+        for user in users:
+            self._remember(user)
+        return users
+
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        users = await self.repository.get_by_emails(emails)
+        for user in users:
+            self._remember(user)
+        return users
+
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        return await self.repository.get_all(
+            limit=limit, offset=offset, after_id=after_id, descending=descending
+        )
+
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        cached = self._by_id.get(user_id, _MISSING)
+        if cached is _NOT_FOUND:
+            return None
+        if cached is not _MISSING:
+            return {field: getattr(cached, field) for field in fields}
+        return await self.repository.get_projection(user_id, fields)
+
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return await self.repository.get_all_projected(
+            fields, limit=limit, offset=offset, after_id=after_id, descending=descending
+        )
+
+    async def count(self) -> int:
+        return await self.repository.count()
+
+    async def estimate_count(self) -> int:
+        return await self.repository.estimate_count()
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        return await self.repository.search(query, limit=limit, prefix=prefix, after=after)
+
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        return await self.repository.get_updated_since(since, after_id=after_id, limit=limit)
+
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        return await self.repository.get_deleted_since(since, after_id=after_id, limit=limit)
+
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        return self.repository.iter_all(batch_size=batch_size)
+
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        updated = await self.repository.update(
+            user_id, email=email, name=name, expected_updated_at=expected_updated_at
+        )
+        if updated:
+            self._remember(updated)
+        else:
+            self._forget(user_id)
+        return updated
+
+    async def delete(self, user_id: int) -> bool:
+        deleted = await self.repository.delete(user_id)
+        self._forget(user_id)
+        return deleted
+
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        outcomes = await self.repository.update_many(updates)
+        for (user_id, _, _), (_, updated) in zip(updates, outcomes):
+            if updated:
+                self._remember(updated)
+            else:
+                self._forget(user_id)
+        return outcomes
+
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        deleted = await self.repository.delete_many(user_ids)
+        for user_id in user_ids:
+            self._forget(user_id)
+        return deleted
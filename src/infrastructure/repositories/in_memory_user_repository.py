@@ -0,0 +1,285 @@
+import asyncio
+import gzip
+import heapq
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.domain.entities.user import User
+from src.domain.exceptions import EntityAlreadyExists
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
+
+
+SNAPSHOT_VERSION = 1
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path
+        self._users: Dict[int, User] = {}
+        self._ids_by_email: Dict[str, int] = {}
+        self._ordered_ids: List[int] = []
+        self._deleted_at: Dict[int, datetime] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _insert(self, user: User) -> None:
+        self._users[user.id] = user
+        self._ids_by_email[user.email] = user.id
+        if not self._ordered_ids or user.id > self._ordered_ids[-1]:
+            self._ordered_ids.append(user.id)
+        else:
+            insort(self._ordered_ids, user.id)
+        self._next_id = max(self._next_id, user.id + 1)
+
+    def _copies(self, user_ids: List[int]) -> List[User]:
+        return [replace(self._users[user_id]) for user_id in user_ids]
+
+    def _project(self, user_id: int, fields: Sequence[str]) -> Dict[str, Any]:
+        user = self._users[user_id]
+        return {field: getattr(user, field) for field in fields}
+
+    async def create(self, user: User) -> Optional[User]:
+        email = user.email.lower()
+        if email in self._ids_by_email:
+            return None
+        now = datetime.now()
+        created = User(id=self._next_id, email=email, name=user.name, created_at=now, updated_at=now)
+        self._insert(created)
+        return replace(created)
+
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
+        return [await self.create(user) for user in users]
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        user = self._users.get(user_id)
+        return replace(user) if user else None
+
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        user = self._users.get(user_id)
+        return (user.updated_at or datetime(1970, 1, 1)) if user else None
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        user_id = self._ids_by_email.get(email.lower())
+        return replace(self._users[user_id]) if user_id is not None else None
+
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        return self._copies([user_id for user_id in set(user_ids) if user_id in self._users])
+
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        user_ids = {self._ids_by_email.get(email.lower()) for email in emails}
+        user_ids.discard(None)
+        return self._copies(list(user_ids))
+
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        return self._project(user_id, fields) if user_id in self._users else None
+
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        return self._copies(self._page(limit, offset, after_id, descending))
+
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        page = self._page(limit, offset, after_id, descending)
+        return [self._project(user_id, fields) for user_id in page]
+
+    def _page(
+        self,
+        limit: int,
+        offset: int,
+        after_id: Optional[int],
+        descending: bool,
+    ) -> List[int]:
+        ids = self._ordered_ids
+        if after_id is None:
+            if descending:
+                end = len(ids) - offset
+                page = ids[max(0, end - limit):max(0, end)][::-1]
+            else:
+                page = ids[offset:offset + limit]
+        elif descending:
+            end = bisect_left(ids, after_id)
+            page = ids[max(0, end - limit):end][::-1]
+        else:
+            start = bisect_right(ids, after_id)
+            page = ids[start:start + limit]
+        return page
+
+    async def count(self) -> int:
+        return len(self._users)
+
+    async def estimate_count(self) -> int:
+        return len(self._users)
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        query = query.lower()
+        matches = []
+        for user_id in self._ordered_ids:
+            user = self._users[user_id]
+            name = user.name.lower()
+            if query in (user.email, name):
+                rank = 0
+            elif user.email.startswith(query) or name.startswith(query):
+                rank = 1
+            elif not prefix and (query in user.email or query in name):
+                rank = 2
+            else:
+                continue
+            if after is None or (rank, user_id) > after:
+                matches.append((rank, user_id))
+        return [
+            (rank, replace(self._users[user_id]))
+            for rank, user_id in heapq.nsmallest(limit, matches)
+        ]
+
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        changed = sorted(
+            (user.updated_at, user_id)
+            for user_id, user in self._users.items()
+            if user.updated_at and (user.updated_at, user_id) > (since, after_id)
+        )
+        return self._copies([user_id for _, user_id in changed[:limit]])
+
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        deleted = sorted(
+            (deleted_at, user_id)
+            for user_id, deleted_at in self._deleted_at.items()
+            if (deleted_at, user_id) > (since, after_id)
+        )
+        return [(user_id, deleted_at) for deleted_at, user_id in deleted[:limit]]
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        after_id = 0
+        while True:
+            start = bisect_right(self._ordered_ids, after_id)
+            batch = self._copies(self._ordered_ids[start:start + batch_size])
+            if not batch:
+                return
+            for user in batch:
+                yield user
+            after_id = batch[-1].id
+            await asyncio.sleep(0)
+
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        user = self._users.get(user_id)
+        if not user:
+            return None
+        version = user.updated_at or datetime(1970, 1, 1)
+        if expected_updated_at is not None and version != expected_updated_at:
+            return None
+        if email:
+            email = email.lower()
+            owner_id = self._ids_by_email.get(email)
+            if owner_id is not None and owner_id != user_id:
+                raise EntityAlreadyExists(f"User with email {email} already exists")
+            del self._ids_by_email[user.email]
+            user.email = email
+            self._ids_by_email[email] = user_id
+        if name:
+            user.name = name
+        user.updated_at = datetime.now()
+        return replace(user)
+
+    async def delete(self, user_id: int) -> bool:
+        user = self._users.pop(user_id, None)
+        if not user:
+            return False
+        del self._ids_by_email[user.email]
+        del self._ordered_ids[bisect_left(self._ordered_ids, user_id)]
+        self._deleted_at[user_id] = datetime.now()
+        return True
+
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        results: List[Tuple[BatchUpdateStatus, Optional[User]]] = []
+        for user_id, email, name in updates:
+            try:
+                updated = await self.update(user_id, email=email, name=name)
+            except EntityAlreadyExists:
+                results.append(("conflict", None))
+                continue
+            results.append(("updated", updated) if updated else ("not_found", None))
+        return results
+
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        return [user_id for user_id in user_ids if await self.delete(user_id)]
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        path = path or self.snapshot_path
+        rows = [
+            [
+                user.id,
+                user.email,
+                user.name,
+                user.created_at.isoformat() if user.created_at else None,
+                user.updated_at.isoformat() if user.updated_at else None,
+            ]
+            for user in (self._users[user_id] for user_id in self._ordered_ids)
+        ]
+        payload = {"version": SNAPSHOT_VERSION, "next_id": self._next_id, "users": rows}
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: Optional[str] = None) -> None:
+        path = path or self.snapshot_path
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {payload.get('version')}")
+
+        self._users.clear()
+        self._ids_by_email.clear()
+        self._ordered_ids.clear()
+        self._deleted_at.clear()
+        self._next_id = 1
+        for user_id, email, name, created_at, updated_at in payload["users"]:
+            self._insert(User(
+                id=user_id,
+                email=email,
+                name=name,
+                created_at=datetime.fromisoformat(created_at) if created_at else None,
+                updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+            ))
+        self._next_id = max(self._next_id, payload["next_id"])
@@ -1,89 +1,451 @@
-from typing import List, Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from src.domain.entities.user import User
-from src.domain.repositories.user_repository import UserRepository
+import asyncpg
+
+from src.domain.entities.user import USER_FIELDS, User
+from src.domain.exceptions import EntityAlreadyExists
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
 from src.infrastructure.database.connection import DatabaseConnection
+from src.infrastructure.database.statements import Statement, statement_registry
+
+
+CREATE_USER = statement_registry.register(
+    "users_create",
+    """
+    insert into users (email, name)
+    values ($1, $2)
+    on conflict (email) do nothing
+    returning id, email, name, created_at, updated_at
+    """,
+)
+
+CREATE_USERS = statement_registry.register(
+    "users_create_many",
+    """
+    insert into users (email, name)
+    select email, name
+    from unnest($1::varchar[], $2::varchar[]) as batch(email, name)
+    on conflict (email) do nothing
+    returning id, email, name, created_at, updated_at
+    """,
+)
+
+GET_USER_BY_ID = statement_registry.register(
+    "users_get_by_id",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    where id = $1
+    """,
+)
+
+GET_USER_VERSION = statement_registry.register(
+    "users_get_version",
+    """
+    select coalesce(updated_at, 'epoch'::timestamp)
+    from users
+    where id = $1
+    """,
+)
+
+GET_USER_BY_EMAIL = statement_registry.register(
+    "users_get_by_email",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    where email = $1
+    """,
+)
+
+GET_USERS_BY_IDS = statement_registry.register(
+    "users_get_by_ids",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    where id = any($1::int[])
+    """,
+)
+
+GET_USERS_BY_EMAILS = statement_registry.register(
+    "users_get_by_emails",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    where email = any($1::varchar[])
+    """,
+)
+
+GET_USERS_PAGE = {
+    descending: statement_registry.register(
+        f"users_get_page_{direction}",
+        f"""
+        select id, email, name, created_at, updated_at
+        from users
+        order by id {direction}
+        limit $1 offset $2
+        """,
+    )
+    for descending, direction in ((False, "asc"), (True, "desc"))
+}
+
+GET_USERS_AFTER = {
+    descending: statement_registry.register(
+        f"users_get_after_{direction}",
+        f"""
+        select id, email, name, created_at, updated_at
+        from users
+        where id {comparison} $1
+        order by id {direction}
+        limit $2
+        """,
+    )
+    for descending, direction, comparison in ((False, "asc", ">"), (True, "desc", "<"))
+}
+
+COUNT_USERS = statement_registry.register(
+    "users_count",
+    """
+    select count(*) from users
+    """,
+)
+
+# Planner-style estimate: tuple density from the last analyze times current size.
+ESTIMATE_USERS_COUNT = statement_registry.register(
+    "users_estimate_count",
+    """
+    select case
+               when reltuples < 0 then -1
+               when relpages = 0 then reltuples::bigint
+               else (reltuples / relpages
+                     * (pg_relation_size(oid) / current_setting('block_size')::int))::bigint
+           end
+    from pg_class
+    where oid = 'users'::regclass
+    """,
+)
+
+SEARCH_USERS = statement_registry.register(
+    "users_search",
+    """
+    select id, email, name, created_at, updated_at, rank
+    from (
+        (
+            select id, email, name, created_at, updated_at, 0 as rank
+            from users
+            where (email = $1 or lower(name) = $1)
+              and ($4 < 0 or ($4 = 0 and id > $5))
+            order by id
+            limit $6
+        )
+        union all
+        (
+            select id, email, name, created_at, updated_at, 1 as rank
+            from users
+            where (email like $2 or lower(name) like $2)
+              and not (email = $1 or lower(name) = $1)
+              and ($4 < 1 or ($4 = 1 and id > $5))
+            order by id
+            limit $6
+        )
+        union all
+        (
+            select id, email, name, created_at, updated_at, 2 as rank
+            from users
+            where (email like $3 or lower(name) like $3)
+              and not (email like $2 or lower(name) like $2)
+              and ($4 < 2 or ($4 = 2 and id > $5))
+            order by id
+            limit $6
+        )
+    ) matches
+    order by rank, id
+    limit $6
+    """,
+)
+
+GET_USERS_UPDATED_SINCE = statement_registry.register(
+    "users_get_updated_since",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    where (updated_at, id) > ($1, $2)
+    order by updated_at, id
+    limit $3
+    """,
+)
+
+GET_USERS_DELETED_SINCE = statement_registry.register(
+    "users_get_deleted_since",
+    """
+    select user_id, deleted_at
+    from user_tombstones
+    where (deleted_at, user_id) > ($1, $2)
+    order by deleted_at, user_id
+    limit $3
+    """,
+)
+
+ITER_USERS = statement_registry.register(
+    "users_iter_all",
+    """
+    select id, email, name, created_at, updated_at
+    from users
+    order by id
+    """,
+)
+
+UPDATE_USER = statement_registry.register(
+    "users_update",
+    """
+    update users
+    set email = coalesce($1, email),
+        name = coalesce($2, name),
+        updated_at = current_timestamp
+    where id = $3
+      and ($4::timestamp is null or coalesce(updated_at, 'epoch'::timestamp) = $4)
+    returning id, email, name, created_at, updated_at
+    """,
+)
+
+UPDATE_USERS = statement_registry.register(
+    "users_update_many",
+    """
+    with batch as (
+        select * from unnest($1::int[], $2::varchar[], $3::varchar[]) as batch(id, email, name)
+    ), updated as (
+        update users
+        set email = coalesce(batch.email, users.email),
+            name = coalesce(batch.name, users.name),
+            updated_at = current_timestamp
+        from batch
+        where users.id = batch.id
+          and (batch.email is null or not exists (
+              select 1 from users other where other.email = batch.email and other.id <> batch.id
+          ))
+        returning users.id, users.email, users.name, users.created_at, users.updated_at
+    )
+    select updated.id, updated.email, updated.name, updated.created_at, updated.updated_at,
+           batch.id as requested_id,
+           exists (select 1 from users where users.id = batch.id) as found
+    from batch
+    left join updated on updated.id = batch.id
+    """,
+)
+
+DELETE_USERS = statement_registry.register(
+    "users_delete_many",
+    """
+    delete from users
+    where id = any($1::int[])
+    returning id
+    """,
+)
+
+DELETE_USER = statement_registry.register(
+    "users_delete",
+    """
+    delete from users
+    where id = $1
+    """,
+)
+
+
+_new_user = object.__new__
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+USER_COLUMNS = ", ".join(USER_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def projected(statement: Statement, fields: Tuple[str, ...]) -> Statement:
+    # Bounded by the number of USER_FIELDS subsets, so the cache needs no size limit.
+    unknown = set(fields) - set(USER_FIELDS)
+    if unknown or not fields:
+        raise ValueError(f"Unknown user fields: {', '.join(sorted(unknown))}")
+    return Statement(
+        name=f"{statement.name}_projected_{'_'.join(fields)}",
+        sql=statement.sql.replace(USER_COLUMNS, ", ".join(fields), 1),
+    )
+
+
+def map_rows_to_users(rows) -> List[User]:
+    # Rows come from the users table, where emails are already stored lowercased,
+    # so the entity is filled positionally without re-running __post_init__.
+    users = []
+    append = users.append
+    for row in rows:
+        user = _new_user(User)
+        user.id, user.email, user.name, user.created_at, user.updated_at = row
+        append(user)
+    return users
 
 
 class PostgresUserRepository(UserRepository):
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
-    def _map_row_to_user(self, row) -> User:
+    def _map_row_to_user(self, row) -> Optional[User]:
         if not row:
             return None
-        return User(
-            id=row['id'],
-            email=row['email'],
-            name=row['name'],
-            created_at=row['created_at'],
-            updated_at=row['updated_at']
-        )
+        return map_rows_to_users((row,))[0]
     
-    async def create(self, user: User) -> User:
-        row = await self.db.fetchrow(
-            """
-            insert into users (email, name)
-            values ($1, $2)
-            returning id, email, name, created_at, updated_at
-            """,
-            user.email, user.name
-        )
+    async def create(self, user: User) -> Optional[User]:
+        row = await self.db.fetchrow(CREATE_USER, user.email, user.name)
         return self._map_row_to_user(row)
     
-    async def get_by_id(self, user_id: int) -> Optional[User]:
-        row = await self.db.fetchrow(
-            """
-            select id, email, name, created_at, updated_at
-            from users
-            where id = $1
-            """,
-            user_id
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
+        rows = await self.db.fetch(
+            CREATE_USERS,
+            [user.email for user in users], [user.name for user in users]
         )
+        created = {user.email: user for user in map_rows_to_users(rows)}
+        return [created.pop(user.email, None) for user in users]
+    
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        row = await self.db.fetchrow(GET_USER_BY_ID, user_id)
         return self._map_row_to_user(row)
     
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        return await self.db.fetchval(GET_USER_VERSION, user_id)
+    
     async def get_by_email(self, email: str) -> Optional[User]:
-        row = await self.db.fetchrow(
-            """
-            select id, email, name, created_at, updated_at
-            from users
-            where email = $1
-            """,
-            email.lower()
-        )
+        row = await self.db.fetchrow(GET_USER_BY_EMAIL, email.lower())
         return self._map_row_to_user(row)
     
-    async def get_all(self, limit: int = 100, offset: int = 0) -> List[User]:
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        rows = await self.db.fetch(GET_USERS_BY_IDS, user_ids)
+        return map_rows_to_users(rows)
+    
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        rows = await self.db.fetch(GET_USERS_BY_EMAILS, [email.lower() for email in emails])
+        return map_rows_to_users(rows)
+    
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        if after_id is None:
+            rows = await self.db.fetch(GET_USERS_PAGE[descending], limit, offset)
+        else:
+            rows = await self.db.fetch(GET_USERS_AFTER[descending], after_id, limit)
+        return map_rows_to_users(rows)
+    
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        row = await self.db.fetchrow(projected(GET_USER_BY_ID, tuple(fields)), user_id)
+        return dict(row) if row else None
+    
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        if after_id is None:
+            statement = projected(GET_USERS_PAGE[descending], tuple(fields))
+            rows = await self.db.fetch(statement, limit, offset)
+        else:
+            statement = projected(GET_USERS_AFTER[descending], tuple(fields))
+            rows = await self.db.fetch(statement, after_id, limit)
+        return [dict(row) for row in rows]
+    
+    async def count(self) -> int:
+        return await self.db.fetchval(COUNT_USERS)
+    
+    async def estimate_count(self) -> int:
+        estimate = await self.db.fetchval(ESTIMATE_USERS_COUNT)
+        return estimate if estimate >= 0 else await self.count()
+    
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        query = query.lower()
+        starts_with = f"{_escape_like(query)}%"
+        pattern = starts_with if prefix else f"%{starts_with}"
+        after_rank, after_id = after if after else (-1, 0)
         rows = await self.db.fetch(
-            """
-            select id, email, name, created_at, updated_at
-            from users
-            order by id
-            limit $1 offset $2
-            """,
-            limit, offset
-        )
-        return [self._map_row_to_user(row) for row in rows]
-    
-    async def update(self, user: User) -> Optional[User]:
-        row = await self.db.fetchrow(
-            """
-            update users
-            set email = $1, name = $2, updated_at = current_timestamp
-            where id = $3
-            returning id, email, name, created_at, updated_at
-            """,
-            user.email, user.name, user.id
+            SEARCH_USERS, query, starts_with, pattern, after_rank, after_id, limit
         )
+        users = map_rows_to_users([row[:5] for row in rows])
+        return [(row["rank"], user) for row, user in zip(rows, users)]
+    
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        rows = await self.db.fetch(GET_USERS_UPDATED_SINCE, since, after_id, limit)
+        return map_rows_to_users(rows)
+    
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        rows = await self.db.fetch(GET_USERS_DELETED_SINCE, since, after_id, limit)
+        return [(row["user_id"], row["deleted_at"]) for row in rows]
+    
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        async for row in self.db.iterate(ITER_USERS, prefetch=batch_size):
+            yield self._map_row_to_user(row)
+    
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        try:
+            row = await self.db.fetchrow(
+                UPDATE_USER, email.lower() if email else None, name, user_id, expected_updated_at
+            )
+        except asyncpg.UniqueViolationError:
+            raise EntityAlreadyExists(f"User with email {email} already exists")
         return self._map_row_to_user(row)
     
     async def delete(self, user_id: int) -> bool:
-        result = await self.db.execute(
-            """
-            delete from users
-            where id = $1
-            """,
-            user_id
-        )
+        result = await self.db.execute(DELETE_USER, user_id)
         return result == "DELETE 1"
-
+    
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        emails = [email.lower() if email else None for _, email, _ in updates]
+        try:
+            rows = await self.db.fetch(
+                UPDATE_USERS,
+                [user_id for user_id, _, _ in updates],
+                emails,
+                [name for _, _, name in updates],
+            )
+        except asyncpg.UniqueViolationError:
+            raise EntityAlreadyExists("Batch update conflicts with an existing email")
+        outcomes: Dict[int, Tuple[BatchUpdateStatus, Optional[User]]] = {}
+        for row in rows:
+            if row["id"] is not None:
+                outcomes[row["requested_id"]] = ("updated", map_rows_to_users((row[:5],))[0])
+            else:
+                outcomes[row["requested_id"]] = ("conflict" if row["found"] else "not_found", None)
+        return [outcomes[user_id] for user_id, _, _ in updates]
+    
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        rows = await self.db.fetch(DELETE_USERS, user_ids)
+        return [row["id"] for row in rows]
@@ -0,0 +1,577 @@
+import asyncio
+import heapq
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+import asyncpg
+
+from src.domain.entities.user import USER_FIELDS, User
+from src.domain.exceptions import EntityAlreadyExists
+from src.domain.repositories.user_repository import BatchUpdateStatus, UserRepository
+from src.infrastructure.config import settings
+from src.infrastructure.database.connection import DatabaseConnection
+from src.infrastructure.database.sharding import ShardMap
+from src.infrastructure.database.statements import statement_registry
+from src.infrastructure.repositories.postgres_user_repository import (
+    PostgresUserRepository,
+    map_rows_to_users,
+)
+
+
+# The id comes from the sequence of the email's shard, so user and index row share a transaction.
+SHARDED_CREATE_USER = statement_registry.register(
+    "users_sharded_create",
+    """
+    with reserved as (
+        insert into user_emails (email, user_id)
+        values ($1, nextval('users_id_seq'))
+        on conflict (email) do nothing
+        returning email, user_id
+    )
+    insert into users (id, email, name)
+    select user_id, email, $2 from reserved
+    returning id, email, name, created_at, updated_at
+    """,
+)
+
+SHARDED_CREATE_USERS = statement_registry.register(
+    "users_sharded_create_many",
+    """
+    with batch as (
+        select * from unnest($1::varchar[], $2::varchar[]) as batch(email, name)
+    ), reserved as (
+        insert into user_emails (email, user_id)
+        select email, nextval('users_id_seq') from batch
+        on conflict (email) do nothing
+        returning email, user_id
+    )
+    insert into users (id, email, name)
+    select reserved.user_id, reserved.email, batch.name
+    from reserved join batch using (email)
+    returning id, email, name, created_at, updated_at
+    """,
+)
+
+SHARDED_GET_USERS_BY_EMAILS = statement_registry.register(
+    "users_sharded_get_by_emails",
+    """
+    select users.id, users.email, users.name, users.created_at, users.updated_at,
+           user_emails.email as indexed_email, user_emails.user_id
+    from user_emails
+    left join users on users.id = user_emails.user_id and users.email = user_emails.email
+    where user_emails.email = any($1::varchar[])
+    """,
+)
+
+GET_EMAIL_OWNER = statement_registry.register(
+    "user_emails_get_owner",
+    """
+    select user_id from user_emails where email = $1
+    """,
+)
+
+RESERVE_EMAIL = statement_registry.register(
+    "user_emails_reserve",
+    """
+    insert into user_emails (email, user_id)
+    values ($1, $2)
+    on conflict (email) do nothing
+    returning user_id
+    """,
+)
+
+RESERVE_EMAILS = statement_registry.register(
+    "user_emails_reserve_many",
+    """
+    insert into user_emails (email, user_id)
+    select * from unnest($1::varchar[], $2::int[])
+    on conflict (email) do nothing
+    returning email, user_id
+    """,
+)
+
+RELEASE_EMAIL = statement_registry.register(
+    "user_emails_release",
+    """
+    delete from user_emails where email = $1 and user_id = $2
+    """,
+)
+
+RELEASE_EMAILS = statement_registry.register(
+    "user_emails_release_many",
+    """
+    delete from user_emails
+    using unnest($1::varchar[], $2::int[]) as released(email, user_id)
+    where user_emails.email = released.email and user_emails.user_id = released.user_id
+    """,
+)
+
+LIST_STALE_EMAIL_CANDIDATES = statement_registry.register(
+    "user_emails_list_reserved_before",
+    """
+    select email, user_id
+    from user_emails
+    where email > $1 and reserved_at < current_timestamp - $2::interval
+    order by email
+    limit $3
+    """,
+)
+
+SHARDED_DELETE_USERS = statement_registry.register(
+    "users_sharded_delete_many",
+    """
+    delete from users where id = any($1::int[]) returning id, email
+    """,
+)
+
+SHARDED_DELETE_USER = statement_registry.register(
+    "users_sharded_delete",
+    """
+    delete from users where id = $1 returning email
+    """,
+)
+
+
+# A user lives on shard (id - 1) % N; users_id_seq on each shard steps by N (see prepare).
+# Email changes reserve the new email, update the user and release the old email in
+# separate databases; an interrupted change leaves a stale user_emails row behind that
+# _release_stale_email or reconcile_emails removes.
+class ShardedUserRepository(UserRepository):
+    def __init__(self, shard_map: ShardMap):
+        self.shard_map = shard_map
+        self.repositories = [PostgresUserRepository(shard) for shard in shard_map.shards]
+
+    def _shard_for_email(self, email: str) -> DatabaseConnection:
+        return self.shard_map.shards[self.shard_map.index_for_email(email)]
+
+    def _repository_for_id(self, user_id: int) -> PostgresUserRepository:
+        return self.repositories[self.shard_map.index_for_id(user_id)]
+
+    async def prepare(self) -> None:
+        await asyncio.gather(
+            *(
+                self._configure_sequence(index, shard)
+                for index, shard in enumerate(self.shard_map.shards)
+            )
+        )
+
+    async def _configure_sequence(self, index: int, shard: DatabaseConnection) -> None:
+        shards = len(self.shard_map)
+        sequence = await shard.fetchrow(
+            "select increment_by, last_value from pg_sequences "
+            "where schemaname = current_schema() and sequencename = 'users_id_seq'"
+        )
+        last_value = sequence["last_value"]
+        if sequence["increment_by"] == shards and last_value is not None:
+            if (last_value - 1) % shards == index:
+                return
+        # Not configured yet: restart at the smallest free id that belongs to this shard.
+        base = max(await shard.fetchval("select coalesce(max(id), 0) from users"), last_value or 0)
+        next_id = base + 1 + (index - base) % shards
+        await shard.execute(
+            f"alter sequence users_id_seq increment by {shards} minvalue 1 restart with {next_id}"
+        )
+
+    async def _release_stale_email(self, email: str) -> bool:
+        shard = self._shard_for_email(email)
+        owner_id = await shard.fetchval(GET_EMAIL_OWNER, email)
+        if owner_id is None:
+            return True
+        owner = await self._repository_for_id(owner_id).get_by_id(owner_id)
+        if owner and owner.email == email:
+            return False
+        await shard.execute(RELEASE_EMAIL, email, owner_id)
+        return True
+
+    async def reconcile_emails(self, min_age: float = 300.0, batch_size: int = 1000) -> int:
+        # Reservations younger than min_age may belong to an update still in flight.
+        released = 0
+        for shard in self.shard_map.shards:
+            after = ""
+            while True:
+                rows = await shard.fetch(
+                    LIST_STALE_EMAIL_CANDIDATES, after, timedelta(seconds=min_age), batch_size
+                )
+                if not rows:
+                    break
+                owners = {
+                    user.id: user.email
+                    for user in await self.get_by_ids([row["user_id"] for row in rows])
+                }
+                stale = [row for row in rows if owners.get(row["user_id"]) != row["email"]]
+                if stale:
+                    await shard.execute(
+                        RELEASE_EMAILS,
+                        [row["email"] for row in stale],
+                        [row["user_id"] for row in stale],
+                    )
+                    released += len(stale)
+                after = rows[-1]["email"]
+        return released
+
+    async def create(self, user: User) -> Optional[User]:
+        email = user.email.lower()
+        shard = self._shard_for_email(email)
+        row = await shard.fetchrow(SHARDED_CREATE_USER, email, user.name)
+        if not row and await self._release_stale_email(email):
+            row = await shard.fetchrow(SHARDED_CREATE_USER, email, user.name)
+        return map_rows_to_users((row,))[0] if row else None
+
+    async def create_many(self, users: List[User]) -> List[Optional[User]]:
+        batches: Dict[int, Dict[str, str]] = defaultdict(dict)
+        for user in users:
+            email = user.email.lower()
+            batches[self.shard_map.index_for_email(email)].setdefault(email, user.name)
+
+        async def create_on_shard(index: int, batch: Dict[str, str]) -> List[User]:
+            rows = await self.shard_map.shards[index].fetch(
+                SHARDED_CREATE_USERS, list(batch), list(batch.values())
+            )
+            return map_rows_to_users(rows)
+
+        created = {
+            user.email: user
+            for shard_users in await asyncio.gather(
+                *(create_on_shard(index, batch) for index, batch in batches.items())
+            )
+            for user in shard_users
+        }
+        return [created.pop(user.email.lower(), None) for user in users]
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self._repository_for_id(user_id).get_by_id(user_id)
+
+    async def get_version(self, user_id: int) -> Optional[datetime]:
+        return await self._repository_for_id(user_id).get_version(user_id)
+
+    async def get_projection(self, user_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        return await self._repository_for_id(user_id).get_projection(user_id, fields)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        users = await self.get_by_emails([email])
+        return users[0] if users else None
+
+    async def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for user_id in set(user_ids):
+            groups[self.shard_map.index_for_id(user_id)].append(user_id)
+        results = await asyncio.gather(
+            *(self.repositories[index].get_by_ids(ids) for index, ids in groups.items())
+        )
+        return [user for users in results for user in users]
+
+    async def get_by_emails(self, emails: List[str]) -> List[User]:
+        groups: Dict[int, List[str]] = defaultdict(list)
+        for email in {email.lower() for email in emails}:
+            groups[self.shard_map.index_for_email(email)].append(email)
+        results = await asyncio.gather(
+            *(
+                self.shard_map.shards[index].fetch(SHARDED_GET_USERS_BY_EMAILS, batch)
+                for index, batch in groups.items()
+            )
+        )
+
+        found, moved = [], {}
+        for rows in results:
+            for row in rows:
+                if row["id"] is not None:
+                    found.extend(map_rows_to_users((row[:5],)))
+                else:
+                    moved[row["user_id"]] = row["indexed_email"]
+        if moved:
+            found.extend(
+                user for user in await self.get_by_ids(list(moved)) if user.email == moved[user.id]
+            )
+        return found
+
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[User]:
+        if after_id is None:
+            pages = await asyncio.gather(
+                *(
+                    repository.get_all(limit=offset + limit, descending=descending)
+                    for repository in self.repositories
+                )
+            )
+            start = offset
+        else:
+            pages = await asyncio.gather(
+                *(
+                    repository.get_all(limit=limit, after_id=after_id, descending=descending)
+                    for repository in self.repositories
+                )
+            )
+            start = 0
+        merged = heapq.merge(*pages, key=attrgetter("id"), reverse=descending)
+        return list(islice(merged, start, start + limit))
+
+    async def get_all_projected(
+        self,
+        fields: Sequence[str],
+        limit: int = 100,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # Shard pages are merged by id, so it is always read.
+        columns = [field for field in USER_FIELDS if field == "id" or field in fields]
+        if after_id is None:
+            pages = await asyncio.gather(
+                *(
+                    repository.get_all_projected(
+                        columns, limit=offset + limit, descending=descending
+                    )
+                    for repository in self.repositories
+                )
+            )
+            start = offset
+        else:
+            pages = await asyncio.gather(
+                *(
+                    repository.get_all_projected(
+                        columns, limit=limit, after_id=after_id, descending=descending
+                    )
+                    for repository in self.repositories
+                )
+            )
+            start = 0
+        merged = heapq.merge(*pages, key=itemgetter("id"), reverse=descending)
+        rows = list(islice(merged, start, start + limit))
+        if "id" not in fields:
+            for row in rows:
+                del row["id"]
+        return rows
+
+    async def count(self) -> int:
+        return sum(await asyncio.gather(*(repository.count() for repository in self.repositories)))
+
+    async def estimate_count(self) -> int:
+        return sum(
+            await asyncio.gather(*(repository.estimate_count() for repository in self.repositories))
+        )
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        prefix: bool = False,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, User]]:
+        pages = await asyncio.gather(
+            *(
+                repository.search(query, limit=limit, prefix=prefix, after=after)
+                for repository in self.repositories
+            )
+        )
+        merged = heapq.merge(*pages, key=lambda match: (match[0], match[1].id))
+        return list(islice(merged, limit))
+
+    async def get_updated_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[User]:
+        pages = await asyncio.gather(
+            *(
+                repository.get_updated_since(since, after_id=after_id, limit=limit)
+                for repository in self.repositories
+            )
+        )
+        merged = heapq.merge(*pages, key=attrgetter("updated_at", "id"))
+        return list(islice(merged, limit))
+
+    async def get_deleted_since(
+        self,
+        since: datetime,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> List[Tuple[int, datetime]]:
+        pages = await asyncio.gather(
+            *(
+                repository.get_deleted_since(since, after_id=after_id, limit=limit)
+                for repository in self.repositories
+            )
+        )
+        merged = heapq.merge(*pages, key=itemgetter(1, 0))
+        return list(islice(merged, limit))
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        after_id = 0
+        while True:
+            batch = await self.get_all(limit=batch_size, after_id=after_id)
+            if not batch:
+                return
+            for user in batch:
+                yield user
+            after_id = batch[-1].id
+
+    async def update(
+        self,
+        user_id: int,
+        email: Optional[str] = None,
+        name: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        repository = self._repository_for_id(user_id)
+        email = email.lower() if email else None
+        current = await repository.get_by_id(user_id) if email else None
+        if not email or not current or current.email == email:
+            return await repository.update(
+                user_id, email=email, name=name, expected_updated_at=expected_updated_at
+            )
+
+        new_shard = self._shard_for_email(email)
+        reserved = await new_shard.fetchval(RESERVE_EMAIL, email, user_id)
+        if reserved is None and await self._release_stale_email(email):
+            reserved = await new_shard.fetchval(RESERVE_EMAIL, email, user_id)
+        if reserved is None:
+            raise EntityAlreadyExists(f"User with email {email} already exists")
+
+        try:
+            updated = await repository.update(
+                user_id, email=email, name=name, expected_updated_at=expected_updated_at
+            )
+        except (EntityAlreadyExists, asyncpg.PostgresError):
+            await new_shard.execute(RELEASE_EMAIL, email, user_id)
+            raise
+        if not updated:
+            await new_shard.execute(RELEASE_EMAIL, email, user_id)
+            return None
+        await self._shard_for_email(current.email).execute(RELEASE_EMAIL, current.email, user_id)
+        return updated
+
+    async def delete(self, user_id: int) -> bool:
+        shard = self.shard_map.shards[self.shard_map.index_for_id(user_id)]
+        email = await shard.fetchval(SHARDED_DELETE_USER, user_id)
+        if email is None:
+            return False
+        await self._shard_for_email(email).execute(RELEASE_EMAIL, email, user_id)
+        return True
+
+    async def _reserve_emails(self, reservations: Dict[int, str]) -> Set[int]:
+        groups: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        for user_id, email in reservations.items():
+            groups[self.shard_map.index_for_email(email)].append((email, user_id))
+        results = await asyncio.gather(
+            *(
+                self.shard_map.shards[index].fetch(
+                    RESERVE_EMAILS, [email for email, _ in batch], [user_id for _, user_id in batch]
+                )
+                for index, batch in groups.items()
+            )
+        )
+        reserved = {(row["email"], row["user_id"]) for rows in results for row in rows}
+
+        rejected = set()
+        for user_id, email in reservations.items():
+            if (email, user_id) in reserved:
+                continue
+            # Taken emails are rare in a batch; stale entries are retried one by one.
+            if await self._release_stale_email(email):
+                shard = self._shard_for_email(email)
+                if await shard.fetchval(RESERVE_EMAIL, email, user_id) is not None:
+                    continue
+            rejected.add(user_id)
+        return rejected
+
+    async def _release_emails(self, entries: List[Tuple[str, int]]) -> None:
+        groups: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        for email, user_id in entries:
+            groups[self.shard_map.index_for_email(email)].append((email, user_id))
+        await asyncio.gather(
+            *(
+                self.shard_map.shards[index].execute(
+                    RELEASE_EMAILS, [email for email, _ in batch], [user_id for _, user_id in batch]
+                )
+                for index, batch in groups.items()
+            )
+        )
+
+    async def update_many(
+        self,
+        updates: List[Tuple[int, Optional[str], Optional[str]]],
+    ) -> List[Tuple[BatchUpdateStatus, Optional[User]]]:
+        # Email changes reserve the new emails in one unnest batch per index shard, then
+        # every item runs in one update per user shard, then the old emails are released.
+        results: Dict[int, Tuple[BatchUpdateStatus, Optional[User]]] = {}
+        changing = {user_id: email.lower() for user_id, email, _ in updates if email}
+        current = {user.id: user for user in await self.get_by_ids(list(changing))}
+        claims = Counter(changing.values())
+        reservations: Dict[int, str] = {}
+        for user_id, email in changing.items():
+            if user_id not in current:
+                results[user_id] = ("not_found", None)
+            elif claims[email] > 1:
+                results[user_id] = ("conflict", None)
+            elif current[user_id].email != email:
+                reservations[user_id] = email
+        for user_id in await self._reserve_emails(reservations):
+            results[user_id] = ("conflict", None)
+            del reservations[user_id]
+
+        groups: Dict[int, List[Tuple[int, Optional[str], Optional[str]]]] = defaultdict(list)
+        for user_id, email, name in updates:
+            if user_id not in results:
+                groups[self.shard_map.index_for_id(user_id)].append((user_id, email, name))
+        shard_results = await asyncio.gather(
+            *(self.repositories[index].update_many(batch) for index, batch in groups.items()),
+            return_exceptions=True,
+        )
+
+        released: List[Tuple[str, int]] = []
+        error: Optional[BaseException] = None
+        for batch, outcomes in zip(groups.values(), shard_results):
+            if isinstance(outcomes, BaseException):
+                error = error or outcomes
+                released.extend(
+                    (reservations[user_id], user_id)
+                    for user_id, _, _ in batch
+                    if user_id in reservations
+                )
+                continue
+            for (user_id, _, _), outcome in zip(batch, outcomes):
+                results[user_id] = outcome
+                if user_id in reservations:
+                    old_email = current[user_id].email
+                    kept = outcome[0] == "updated"
+                    released.append((old_email if kept else reservations[user_id], user_id))
+        await self._release_emails(released)
+        if error is not None:
+            raise error
+        return [results[user_id] for user_id, _, _ in updates]
+
+    async def delete_many(self, user_ids: List[int]) -> List[int]:
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for user_id in set(user_ids):
+            groups[self.shard_map.index_for_id(user_id)].append(user_id)
+        results = await asyncio.gather(
+            *(
+                self.shard_map.shards[index].fetch(SHARDED_DELETE_USERS, ids)
+                for index, ids in groups.items()
+            )
+        )
+        await self._release_emails([(row["email"], row["id"]) for rows in results for row in rows])
+        return [row["id"] for rows in results for row in rows]
+
+
+async def main():
+    repository = ShardedUserRepository(ShardMap.from_dsns(settings.database_shard_dsns))
+    await repository.shard_map.connect()
+    try:
+        released = await repository.reconcile_emails()
+        print(f"Released {released} stale email reservation(s)")
+    finally:
+        await repository.shard_map.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,28 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.infrastructure import metrics
+from src.infrastructure.admission import AdmissionController
+from src.infrastructure.config import settings
 from src.infrastructure.database.connection import db_connection
+from src.presentation.api.container import Container
+from src.presentation.api.dependencies import get_container
+from src.presentation.api.middleware import AdmissionMiddleware, MetricsMiddleware
+from src.presentation.api.responses import payload_json_response
 from src.presentation.api.routes.users import router as users_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await db_connection.connect()
+    container = Container(settings, db_connection)
+    await container.start()
+    app.state.container = container
     yield
-    await db_connection.disconnect()
+    await container.stop()
+    metrics.mark_process_dead()
 
 
 def create_app() -> FastAPI:
@@ -21,20 +33,68 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    if settings.admission_enabled:
+        # Inside CORS and metrics so 503s get CORS headers and are counted; long-lived
+        # streams are exempt.
+        app.add_middleware(
+            AdmissionMiddleware,
+            controller=AdmissionController(
+                initial_limit=settings.admission_initial_limit,
+                min_limit=settings.admission_min_limit,
+                max_limit=settings.admission_max_limit,
+                latency_target=settings.admission_latency_target_seconds,
+                decrease_factor=settings.admission_decrease_factor,
+                queue_sizes={
+                    "write": settings.admission_write_queue_size,
+                    "read": settings.admission_read_queue_size,
+                },
+                queue_timeout=settings.admission_queue_timeout_seconds,
+            ),
+            prefixes=("/users",),
+            exempt=("/users/changes", "/users/export"),
+            retry_after=settings.admission_retry_after_seconds,
+        )
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified", "Retry-After", "X-Next-Cursor", "X-Total-Count"],
     )
 
+    app.add_middleware(MetricsMiddleware)
+
     app.include_router(users_router)
 
     @app.get("/health")
     async def health_check():
         return {"status": "ok"}
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        if db_connection.pool:
+            metrics.observe_pool(db_connection.pool)
+        content, content_type = metrics.render_metrics()
+        return Response(content=content, media_type=content_type)
+
+    @app.get("/debug/slow-queries", include_in_schema=False)
+    async def slow_queries_endpoint(
+        request: Request,
+        limit: int = Query(20, ge=1, le=500),
+        order_by: Literal["total_ms", "max_ms", "mean_ms", "calls"] = "total_ms",
+    ):
+        slow_query_log = get_container(request).slow_query_log
+        # Unauthenticated, so it is only served in debug mode.
+        if slow_query_log is None or not settings.debug:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Slow query log is disabled"
+            )
+        return payload_json_response(
+            [stats.to_dict() for stats in slow_query_log.top(limit=limit, order_by=order_by)]
+        )
+
     return app
 
 
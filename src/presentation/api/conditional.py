@@ -0,0 +1,74 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def naive_utc(value: datetime) -> datetime:
+    # timestamp columns have no zone and are stored in UTC.
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _version(updated_at: Optional[datetime]) -> datetime:
+    return naive_utc(updated_at or EPOCH)
+
+
+def user_etag(user_id: int, updated_at: Optional[datetime]) -> str:
+    return f'"{user_id:x}-{(_version(updated_at) - EPOCH) // _MICROSECOND:x}"'
+
+
+def parse_user_etag(etag: str) -> Optional[Tuple[int, datetime]]:
+    etag = etag.strip()
+    # If-Match uses strong comparison: a weak tag from an encoded response never matches.
+    if etag.startswith("W/"):
+        return None
+    user_id, _, micros = etag.strip('"').partition("-")
+    try:
+        return int(user_id, 16), EPOCH + int(micros, 16) * _MICROSECOND
+    except ValueError:
+        return None
+
+
+def versions_etag(versions: Iterable[Tuple[int, Optional[datetime]]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for user_id, updated_at in versions:
+        digest.update(user_etag(user_id, updated_at).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def last_modified(updated_at: Optional[datetime]) -> str:
+    return format_datetime(_version(updated_at).replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def user_headers(user_id: int, updated_at: Optional[datetime]) -> Dict[str, str]:
+    return {"ETag": user_etag(user_id, updated_at), "Last-Modified": last_modified(updated_at)}
+
+
+def _etags(header: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    updated_at: Optional[datetime] = None,
+) -> bool:
+    if if_none_match is not None:
+        tags = _etags(if_none_match)
+        return "*" in tags or etag in tags
+    if if_modified_since is None or updated_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified has one-second precision.
+    modified = _version(updated_at).replace(microsecond=0, tzinfo=timezone.utc)
+    return modified <= since
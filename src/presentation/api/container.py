@@ -0,0 +1,180 @@
+import os
+import time
+from typing import List, Optional
+
+from src.application.services.user_counter import UserCounter
+from src.application.use_cases.user_use_cases import (
+    CreateUserUseCase,
+    CreateUsersBatchUseCase,
+    CountUsersUseCase,
+    DeleteUsersBatchUseCase,
+    GetUserUseCase,
+    GetUserProjectionUseCase,
+    GetUserVersionUseCase,
+    GetAllUsersUseCase,
+    GetAllUsersProjectionUseCase,
+    UpdateUserUseCase,
+    UpdateUsersBatchUseCase,
+    DeleteUserUseCase,
+    ExportUsersUseCase,
+    SearchUsersUseCase,
+    StreamUserChangesUseCase,
+)
+from src.domain.repositories.user_repository import UserRepository
+from src.infrastructure import metrics
+from src.infrastructure.config import Settings
+from src.infrastructure.database.change_feed import PostgresUserChangeFeed
+from src.infrastructure.database.connection import DatabaseConnection
+from src.infrastructure.database.sharding import ShardMap
+from src.infrastructure.database.slow_query_log import SlowQueryLog
+from src.infrastructure.repositories.batching_user_repository import BatchingUserRepository
+from src.infrastructure.repositories.cached_user_repository import CachedUserRepository
+from src.infrastructure.repositories.in_memory_user_repository import InMemoryUserRepository
+from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from src.infrastructure.repositories.sharded_user_repository import ShardedUserRepository
+
+
+class Container:
+    def __init__(self, settings: Settings, db: DatabaseConnection):
+        started = time.perf_counter()
+        self.settings = settings
+        self.db = db
+
+        self.in_memory_repository: Optional[InMemoryUserRepository] = None
+        self.sharded_repository: Optional[ShardedUserRepository] = None
+        self.user_repository = self._build_user_repository()
+        self.change_feed = self._build_change_feed()
+        self.slow_query_log = self._build_slow_query_log()
+
+        self.user_counter = UserCounter(
+            self.user_repository, refresh_interval=settings.users_count_refresh_seconds
+        )
+
+        self.create_user = CreateUserUseCase(self.user_repository, counter=self.user_counter)
+        self.create_users_batch = CreateUsersBatchUseCase(
+            self.user_repository,
+            max_batch_size=settings.users_batch_max_size,
+            counter=self.user_counter,
+        )
+        self.get_user = GetUserUseCase(self.user_repository)
+        self.get_user_version = GetUserVersionUseCase(self.user_repository)
+        self.get_all_users = GetAllUsersUseCase(self.user_repository)
+        self.get_user_projection = GetUserProjectionUseCase(self.user_repository)
+        self.get_all_users_projection = GetAllUsersProjectionUseCase(self.user_repository)
+        self.update_user = UpdateUserUseCase(self.user_repository)
+        self.update_users_batch = UpdateUsersBatchUseCase(
+            self.user_repository, max_batch_size=settings.users_batch_write_max_size
+        )
+        self.delete_user = DeleteUserUseCase(self.user_repository, counter=self.user_counter)
+        self.delete_users_batch = DeleteUsersBatchUseCase(
+            self.user_repository,
+            max_batch_size=settings.users_batch_write_max_size,
+            counter=self.user_counter,
+        )
+        self.count_users = CountUsersUseCase(self.user_repository, self.user_counter)
+        self.search_users = SearchUsersUseCase(
+            self.user_repository, min_query_length=settings.users_search_min_query_length
+        )
+        self.export_users = ExportUsersUseCase(
+            self.user_repository, batch_size=settings.users_export_batch_size
+        )
+        self.stream_user_changes = StreamUserChangesUseCase(
+            self.user_repository, self.change_feed, batch_size=settings.users_export_batch_size
+        )
+        self.build_seconds = time.perf_counter() - started
+        self.startup_seconds: Optional[float] = None
+
+    def _build_user_repository(self) -> UserRepository:
+        settings = self.settings
+        if settings.user_repository_backend == "memory":
+            self.in_memory_repository = InMemoryUserRepository(
+                snapshot_path=settings.user_repository_snapshot_path
+            )
+            repository: UserRepository = self.in_memory_repository
+        elif settings.user_repository_backend == "sharded":
+            self.sharded_repository = ShardedUserRepository(
+                ShardMap.from_dsns(settings.database_shard_dsns)
+            )
+            repository = self.sharded_repository
+        else:
+            repository = PostgresUserRepository(self.db)
+
+        if settings.user_loader_enabled:
+            repository = BatchingUserRepository(
+                repository,
+                window=settings.user_loader_window_us / 1_000_000,
+                max_batch_size=settings.user_loader_max_batch_size,
+            )
+        if settings.user_cache_enabled:
+            repository = CachedUserRepository(
+                repository,
+                max_size=settings.user_cache_max_size,
+                ttl=settings.user_cache_ttl_seconds,
+                negative_ttl=settings.user_cache_negative_ttl_seconds,
+            )
+        return repository
+
+    def _databases(self) -> List[DatabaseConnection]:
+        if self.sharded_repository is not None:
+            return self.sharded_repository.shard_map.shards
+        return [self.db]
+
+    def _build_slow_query_log(self) -> Optional[SlowQueryLog]:
+        settings = self.settings
+        if not settings.slow_query_log_enabled or self.in_memory_repository is not None:
+            return None
+        slow_query_log = SlowQueryLog(
+            threshold=settings.slow_query_threshold_ms / 1000,
+            sample_rate=settings.slow_query_explain_sample_rate,
+            explain_interval=settings.slow_query_explain_interval_seconds,
+        )
+        for db in self._databases():
+            db.slow_query_log = slow_query_log
+        return slow_query_log
+
+    def _build_change_feed(self) -> Optional[PostgresUserChangeFeed]:
+        settings = self.settings
+        if not settings.users_changes_enabled or self.in_memory_repository is not None:
+            return None
+        return PostgresUserChangeFeed(
+            [db.connect_kwargs() for db in self._databases()],
+            queue_size=settings.users_changes_queue_size,
+            heartbeat=settings.users_changes_heartbeat_seconds,
+        )
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        if self.in_memory_repository is not None:
+            snapshot_path = self.in_memory_repository.snapshot_path
+            if snapshot_path and os.path.exists(snapshot_path):
+                self.in_memory_repository.load_snapshot()
+        elif self.sharded_repository is not None:
+            shard_map = self.sharded_repository.shard_map
+            await shard_map.connect()
+            if self.settings.database_pool_warm_up:
+                await shard_map.warm_up()
+            await self.sharded_repository.prepare()
+        else:
+            await self.db.connect()
+            if self.settings.database_pool_warm_up:
+                await self.db.warm_up()
+        if self.change_feed is not None:
+            await self.change_feed.start()
+        self.startup_seconds = self.build_seconds + time.perf_counter() - started
+        metrics.observe_startup(self.startup_seconds)
+
+    async def stop(self) -> None:
+        await self.user_counter.stop()
+        if self.slow_query_log is not None:
+            await self.slow_query_log.stop()
+            for db in self._databases():
+                db.slow_query_log = None
+        if self.change_feed is not None:
+            await self.change_feed.stop()
+        if self.in_memory_repository is not None:
+            if self.in_memory_repository.snapshot_path:
+                self.in_memory_repository.save_snapshot()
+        elif self.sharded_repository is not None:
+            await self.sharded_repository.shard_map.disconnect()
+        else:
+            await self.db.disconnect()
@@ -1,34 +1,99 @@
+from fastapi import Request
+
 from src.application.use_cases.user_use_cases import (
     CreateUserUseCase,
+    CreateUsersBatchUseCase,
+    CountUsersUseCase,
+    DeleteUsersBatchUseCase,
     GetUserUseCase,
+    GetUserProjectionUseCase,
+    GetUserVersionUseCase,
     GetAllUsersUseCase,
+    GetAllUsersProjectionUseCase,
     UpdateUserUseCase,
+    UpdateUsersBatchUseCase,
     DeleteUserUseCase,
+    ExportUsersUseCase,
+    SearchUsersUseCase,
+    StreamUserChangesUseCase,
 )
-from src.infrastructure.database.connection import db_connection
-from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from src.infrastructure.config import settings
+from src.presentation.api.container import Container
+from src.presentation.api.responses import ResponseEncoder
+
+
+def get_container(request: Request) -> Container:
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        raise RuntimeError("Container is not started; run the app with its lifespan")
+    return container
+
+
+def get_create_user_use_case(request: Request) -> CreateUserUseCase:
+    return get_container(request).create_user
+
+
+def get_create_users_batch_use_case(request: Request) -> CreateUsersBatchUseCase:
+    return get_container(request).create_users_batch
+
+
+def get_get_user_use_case(request: Request) -> GetUserUseCase:
+    return get_container(request).get_user
+
+
+def get_get_user_version_use_case(request: Request) -> GetUserVersionUseCase:
+    return get_container(request).get_user_version
+
+
+def get_get_all_users_use_case(request: Request) -> GetAllUsersUseCase:
+    return get_container(request).get_all_users
+
+
+def get_get_user_projection_use_case(request: Request) -> GetUserProjectionUseCase:
+    return get_container(request).get_user_projection
+
+
+def get_get_all_users_projection_use_case(request: Request) -> GetAllUsersProjectionUseCase:
+    return get_container(request).get_all_users_projection
+
+
+def get_count_users_use_case(request: Request) -> CountUsersUseCase:
+    return get_container(request).count_users
+
+
+def get_update_user_use_case(request: Request) -> UpdateUserUseCase:
+    return get_container(request).update_user
+
 
+def get_update_users_batch_use_case(request: Request) -> UpdateUsersBatchUseCase:
+    return get_container(request).update_users_batch
 
-def get_user_repository():
-    return PostgresUserRepository(db_connection)
 
+def get_delete_user_use_case(request: Request) -> DeleteUserUseCase:
+    return get_container(request).delete_user
 
-def get_create_user_use_case():
-    return CreateUserUseCase(get_user_repository())
 
+def get_delete_users_batch_use_case(request: Request) -> DeleteUsersBatchUseCase:
+    return get_container(request).delete_users_batch
 
-def get_get_user_use_case():
-    return GetUserUseCase(get_user_repository())
 
+def get_export_users_use_case(request: Request) -> ExportUsersUseCase:
+    return get_container(request).export_users
 
-def get_get_all_users_use_case():
-    return GetAllUsersUseCase(get_user_repository())
 
+def get_search_users_use_case(request: Request) -> SearchUsersUseCase:
+    return get_container(request).search_users
 
-def get_update_user_use_case():
-    return UpdateUserUseCase(get_user_repository())
 
+def get_stream_user_changes_use_case(request: Request) -> StreamUserChangesUseCase:
+    return get_container(request).stream_user_changes
 
-def get_delete_user_use_case():
-    return DeleteUserUseCase(get_user_repository())
 
+def get_response_encoder(request: Request) -> ResponseEncoder:
+    return ResponseEncoder(
+        accept=request.headers.get("accept"),
+        accept_encoding=request.headers.get("accept-encoding"),
+        minimum_size=settings.response_compression_min_size,
+        offload_size=settings.response_compression_offload_size,
+        levels={"gzip": settings.response_gzip_level, "zstd": settings.response_zstd_level},
+    )
@@ -0,0 +1,63 @@
+import gzip
+from typing import Dict, Optional
+
+import zstandard
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# On equal q the first wins: zstd compresses as well as gzip and much faster.
+CONTENT_ENCODINGS = ("zstd", "gzip")
+
+
+def _qualities(header: str) -> Dict[str, float]:
+    qualities = {}
+    for part in header.split(","):
+        value, *params = part.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        qualities[value] = quality
+    return qualities
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    if not accept:
+        return False
+    qualities = _qualities(accept)
+    msgpack_quality = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_quality = qualities.get(
+        "application/json", qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+    # msgpack only when named explicitly; */* stays JSON.
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def choose_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    qualities = _qualities(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in CONTENT_ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "zstd":
+        # Compressors are not thread-safe and this may run in a thread: one per response.
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
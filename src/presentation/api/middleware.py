@@ -0,0 +1,108 @@
+import json
+import time
+from typing import Callable, Dict, Sequence
+
+from src.infrastructure import metrics
+from src.infrastructure.admission import AdmissionController, Overloaded
+
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_OVERLOADED_BODY = json.dumps({"detail": "Service is overloaded, retry later"}).encode()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._endpoint_paths: Dict[Callable, str] = {}
+
+    def _route_label(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._endpoint_paths:
+            self._endpoint_paths[endpoint] = next(
+                (
+                    route.path
+                    for route in scope["app"].routes
+                    if getattr(route, "endpoint", None) is endpoint
+                ),
+                "unmatched",
+            )
+        return self._endpoint_paths[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.observe_request(
+                scope["method"],
+                self._route_label(scope),
+                status_code,
+                time.perf_counter() - started,
+            )
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        prefixes: Sequence[str] = ("/",),
+        exempt: Sequence[str] = (),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.controller = controller
+        self.prefixes = tuple(prefixes)
+        self.exempt = tuple(exempt)
+        self.retry_after = str(retry_after)
+
+    def _applies(self, path: str) -> bool:
+        return path.startswith(self.prefixes) and not path.startswith(self.exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._applies(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        priority = "read" if scope["method"] in READ_METHODS else "write"
+        try:
+            await self.controller.acquire(priority)
+        except Overloaded:
+            await self._reject(send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - started)
+
+    async def _reject(self, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_OVERLOADED_BODY)).encode()),
+                (b"retry-after", self.retry_after.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _OVERLOADED_BODY})
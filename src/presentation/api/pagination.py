@@ -0,0 +1,37 @@
+import base64
+import binascii
+from typing import Tuple
+
+
+def _encode(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> str:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+
+def encode_cursor(last_id: int, descending: bool) -> str:
+    return _encode(f"{'d' if descending else 'a'}:{last_id}")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, bool]:
+    direction, _, last_id = _decode(cursor).partition(":")
+    if direction not in ("a", "d"):
+        raise ValueError(f"Invalid cursor direction: {direction}")
+    return int(last_id), direction == "d"
+
+
+def encode_search_cursor(rank: int, last_id: int) -> str:
+    return _encode(f"s:{rank}:{last_id}")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[int, int]:
+    kind, rank, last_id = (_decode(cursor).split(":") + ["", "", ""])[:3]
+    if kind != "s":
+        raise ValueError("Not a search cursor")
+    return int(rank), int(last_id)
@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.domain.entities.user import USER_FIELDS
+
+
+_FIELD = "|".join(USER_FIELDS)
+
+FIELDS_PATTERN = f"^({_FIELD})(,({_FIELD}))*$"
+FIELDS_DESCRIPTION = (
+    f"Comma-separated subset of user fields to return ({', '.join(USER_FIELDS)}); "
+    "omitted fields are not read from the database"
+)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    return list(dict.fromkeys(fields.split(",")))
+
+
+def select_fields(row: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    # Columns read only for headers (id, updated_at) are dropped from the body.
+    return {field: row[field] for field in fields}
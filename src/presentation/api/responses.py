@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import msgpack
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+
+from src.domain.entities.user import User
+from src.presentation.api.encoding import (
+    MSGPACK_MEDIA_TYPE,
+    choose_content_encoding,
+    compress,
+    prefers_msgpack,
+)
+
+
+JSON_MEDIA_TYPE = "application/json"
+
+_user_adapter = TypeAdapter(User)
+_users_adapter = TypeAdapter(List[User])
+
+
+def json_response(
+    content: bytes,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return Response(
+        content=content, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE
+    )
+
+
+def user_json_response(
+    user: User,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return json_response(_user_adapter.dump_json(user), status_code=status_code, headers=headers)
+
+
+def users_json_response(
+    users: List[User],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return json_response(_users_adapter.dump_json(users), headers=headers)
+
+
+def payload_json_response(
+    payload: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return json_response(to_json(payload), status_code=status_code, headers=headers)
+
+
+# Body format from Accept (JSON or msgpack), compression from Accept-Encoding.
+class ResponseEncoder:
+    def __init__(
+        self,
+        accept: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+        minimum_size: int = 1024,
+        offload_size: int = 262144,
+        levels: Optional[Dict[str, int]] = None,
+    ):
+        self.msgpack = prefers_msgpack(accept)
+        self.content_encoding = choose_content_encoding(accept_encoding)
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.levels = {"gzip": 6, "zstd": 3, **(levels or {})}
+
+    @property
+    def media_type(self) -> str:
+        return MSGPACK_MEDIA_TYPE if self.msgpack else JSON_MEDIA_TYPE
+
+    async def users(self, users: List[User], headers: Optional[Dict[str, str]] = None) -> Response:
+        if self.msgpack:
+            body = msgpack.packb(_users_adapter.dump_python(users, mode="json"))
+        else:
+            body = _users_adapter.dump_json(users)
+        return await self._respond(body, headers)
+
+    async def payload(self, payload: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+        if self.msgpack:
+            body = msgpack.packb(to_jsonable_python(payload))
+        else:
+            body = to_json(payload)
+        return await self._respond(body, headers)
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+        # Weakened from the negotiated representation, not the body size, so that a 304
+        # carries the same validator as the 200 it revalidates.
+        if (self.content_encoding or self.msgpack) and headers.get("ETag", "").startswith('"'):
+            headers["ETag"] = f"W/{headers['ETag']}"
+        return headers
+
+    def not_modified(self, headers: Optional[Dict[str, str]] = None) -> Response:
+        return Response(status_code=304, headers=self._headers(headers))
+
+    async def _respond(self, body: bytes, headers: Optional[Dict[str, str]]) -> Response:
+        headers = self._headers(headers)
+        encoding = self.content_encoding if len(body) >= self.minimum_size else None
+        if encoding:
+            level = self.levels[encoding]
+            if len(body) >= self.offload_size:
+                # Large pages take milliseconds of CPU to compress; keep the event loop free.
+                body = await asyncio.to_thread(compress, body, encoding, level)
+            else:
+                body = compress(body, encoding, level)
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, headers=headers, media_type=self.media_type)
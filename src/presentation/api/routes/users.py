@@ -1,23 +1,89 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from src.application.use_cases.user_use_cases import (
     CreateUserUseCase,
+    CreateUsersBatchUseCase,
+    CountUsersUseCase,
+    DeleteUsersBatchUseCase,
     GetUserUseCase,
+    GetUserProjectionUseCase,
+    GetUserVersionUseCase,
     GetAllUsersUseCase,
+    GetAllUsersProjectionUseCase,
     UpdateUserUseCase,
+    UpdateUsersBatchUseCase,
     DeleteUserUseCase,
+    ExportUsersUseCase,
+    SearchUsersUseCase,
+    StreamUserChangesUseCase,
+)
+from src.domain.exceptions import (
+    EntityAlreadyExists,
+    EntityNotFound,
+    PreconditionFailed,
+    ValidationError,
 )
-from src.domain.exceptions import EntityAlreadyExists, EntityNotFound, ValidationError
 from src.presentation.api.dependencies import (
     get_create_user_use_case,
+    get_create_users_batch_use_case,
     get_get_user_use_case,
+    get_get_user_projection_use_case,
+    get_get_user_version_use_case,
     get_get_all_users_use_case,
+    get_get_all_users_projection_use_case,
+    get_count_users_use_case,
     get_update_user_use_case,
+    get_update_users_batch_use_case,
     get_delete_user_use_case,
+    get_delete_users_batch_use_case,
+    get_export_users_use_case,
+    get_search_users_use_case,
+    get_stream_user_changes_use_case,
+    get_response_encoder,
+)
+from src.presentation.api.conditional import (
+    is_not_modified,
+    naive_utc,
+    parse_user_etag,
+    user_headers,
+    versions_etag,
+)
+from src.presentation.api.encoding import MSGPACK_MEDIA_TYPE
+from src.presentation.api.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+from src.presentation.api.projection import (
+    FIELDS_DESCRIPTION,
+    FIELDS_PATTERN,
+    parse_fields,
+    select_fields,
+)
+from src.presentation.api.responses import (
+    ResponseEncoder,
+    payload_json_response,
+    user_json_response,
+)
+from src.presentation.api.streaming import (
+    changes_to_sse,
+    parse_change_event_id,
+    users_to_csv,
+    users_to_ndjson,
 )
 from src.presentation.schemas.user_schemas import (
+    UserBatchCreateRequest,
+    UserBatchCreateResponse,
+    UserBatchDeleteRequest,
+    UserBatchDeleteResponse,
+    UserBatchUpdateRequest,
+    UserBatchUpdateResponse,
     UserCreateRequest,
+    UserPartialResponse,
     UserUpdateRequest,
     UserResponse,
 )
@@ -33,73 +99,356 @@ async def create_user(
 ):
     try:
         user = await use_case.execute(email=request.email, name=request.name)
-        return UserResponse(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
+        return user_json_response(
+            user,
+            status_code=status.HTTP_201_CREATED,
+            headers=user_headers(user.id, user.updated_at),
+        )
+    except EntityAlreadyExists as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+@router.post("/batch", response_model=UserBatchCreateResponse)
+async def create_users_batch(
+    request: UserBatchCreateRequest,
+    use_case: CreateUsersBatchUseCase = Depends(get_create_users_batch_use_case),
+):
+    try:
+        created_users = await use_case.execute(
+            users=[(item.email, item.name) for item in request.users]
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    results = [
+        {
+            "index": index,
+            "email": item.email,
+            "status": "created" if user else "duplicate",
+            "user": user,
+        }
+        for index, (item, user) in enumerate(zip(request.users, created_users))
+    ]
+    created = sum(1 for user in created_users if user)
+    return payload_json_response({
+        "created": created,
+        "duplicates": len(created_users) - created,
+        "results": results,
+    })
+
+
+@router.patch("/batch", response_model=UserBatchUpdateResponse)
+async def update_users_batch(
+    request: UserBatchUpdateRequest,
+    use_case: UpdateUsersBatchUseCase = Depends(get_update_users_batch_use_case),
+):
+    try:
+        outcomes = await use_case.execute(
+            updates=[(item.id, item.email, item.name) for item in request.users]
         )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     except EntityAlreadyExists as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    results = [
+        {"id": item.id, "status": item_status, "user": user}
+        for item, (item_status, user) in zip(request.users, outcomes)
+    ]
+    statuses = [item_status for item_status, _ in outcomes]
+    return payload_json_response({
+        "updated": statuses.count("updated"),
+        "not_found": statuses.count("not_found"),
+        "conflicts": statuses.count("conflict"),
+        "results": results,
+    })
+
+
+@router.delete("/batch", response_model=UserBatchDeleteResponse)
+async def delete_users_batch(
+    request: UserBatchDeleteRequest,
+    use_case: DeleteUsersBatchUseCase = Depends(get_delete_users_batch_use_case),
+):
+    try:
+        deleted = await use_case.execute(user_ids=request.ids)
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
+    return payload_json_response({
+        "deleted": sum(deleted),
+        "not_found": len(deleted) - sum(deleted),
+        "results": [
+            {"id": user_id, "status": "deleted" if is_deleted else "not_found"}
+            for user_id, is_deleted in zip(request.ids, deleted)
+        ],
+    })
 
-@router.get("/{user_id}", response_model=UserResponse)
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    use_case: ExportUsersUseCase = Depends(get_export_users_use_case),
+):
+    users = use_case.execute()
+    if format == "csv":
+        return StreamingResponse(
+            users_to_csv(users, chunk_size=use_case.batch_size),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+        )
+    return StreamingResponse(
+        users_to_ndjson(users, chunk_size=use_case.batch_size),
+        media_type="application/x-ndjson",
+    )
+
+
+CHANGES_DESCRIPTION = (
+    "Server-sent events for user inserts, updates and deletes. On reconnect pass "
+    "Last-Event-ID (or ?since=) to catch up from the table before live events.\n\n"
+    "Catch-up limits: changes are ordered by updated_at, which is the start time of the "
+    "writing transaction, so a long transaction that commits after a later change was "
+    "already delivered can be skipped. Deletes are replayed from user_tombstones and are "
+    "lost once their tombstones have been purged. Events at the catch-up/live boundary "
+    "may be delivered twice."
+)
+
+
+@router.get(
+    "/changes",
+    response_class=StreamingResponse,
+    description=CHANGES_DESCRIPTION,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        503: {"description": "Change feed is not available for this backend"},
+    },
+)
+async def stream_user_changes(
+    since: Optional[datetime] = None,
+    last_event_id: Optional[str] = Header(None),
+    use_case: StreamUserChangesUseCase = Depends(get_stream_user_changes_use_case),
+):
+    if use_case.change_feed is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Change feed is not available"
+        )
+
+    after_id = 0
+    if last_event_id is not None:
+        try:
+            since, after_id = parse_change_event_id(last_event_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID"
+            )
+    if since is not None:
+        since = naive_utc(since)
+
+    return StreamingResponse(
+        changes_to_sse(use_case.execute(since=since, after_id=after_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=List[UserResponse],
+    responses={
+        200: {
+            "content": {MSGPACK_MEDIA_TYPE: {}},
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Opaque cursor for the next page, absent on the last page",
+                    "schema": {"type": "string"},
+                },
+            },
+        },
+    },
+)
+async def search_users(
+    q: str,
+    prefix: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    use_case: SearchUsersUseCase = Depends(get_search_users_use_case),
+    encoder: ResponseEncoder = Depends(get_response_encoder),
+):
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    try:
+        matches = await use_case.execute(query=q, limit=limit, prefix=prefix, after=after)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    headers = {}
+    if len(matches) == limit:
+        rank, last_user = matches[-1]
+        headers["X-Next-Cursor"] = encode_search_cursor(rank, last_user.id)
+    return await encoder.users([user for _, user in matches], headers=headers)
+
+
+@router.get(
+    "/{user_id}",
+    response_model=Union[UserResponse, UserPartialResponse],
+    responses={304: {"description": "Not Modified"}},
+)
 async def get_user(
     user_id: int,
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     use_case: GetUserUseCase = Depends(get_get_user_use_case),
+    version_use_case: GetUserVersionUseCase = Depends(get_get_user_version_use_case),
+    projection_use_case: GetUserProjectionUseCase = Depends(get_get_user_projection_use_case),
 ):
+    requested = parse_fields(fields)
     try:
-        user = await use_case.execute(user_id=user_id)
-        return UserResponse(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
+        if if_none_match is not None or if_modified_since is not None:
+            updated_at = await version_use_case.execute(user_id=user_id)
+            headers = user_headers(user_id, updated_at)
+            if is_not_modified(if_none_match, if_modified_since, headers["ETag"], updated_at):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if requested is None:
+            user = await use_case.execute(user_id=user_id)
+            return user_json_response(user, headers=user_headers(user.id, user.updated_at))
+
+        row = await projection_use_case.execute(
+            user_id=user_id, fields=[*requested, "updated_at"]
+        )
+        return payload_json_response(
+            select_fields(row, requested), headers=user_headers(user_id, row["updated_at"])
         )
     except EntityNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get(
+    "/",
+    response_model=List[Union[UserResponse, UserPartialResponse]],
+    responses={
+        200: {
+            "content": {MSGPACK_MEDIA_TYPE: {}},
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Opaque cursor for the next page, absent on the last page",
+                    "schema": {"type": "string"},
+                },
+                "ETag": {
+                    "description": "Strong validator of the page, derived from (id, updated_at)",
+                    "schema": {"type": "string"},
+                },
+                "X-Total-Count": {
+                    "description": "Total number of users, present when `total` is requested",
+                    "schema": {"type": "integer"},
+                },
+            },
+        },
+        304: {"description": "Not Modified"},
+    },
+)
 async def get_all_users(
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    total: Optional[Literal["exact", "estimated", "cached"]] = None,
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     use_case: GetAllUsersUseCase = Depends(get_get_all_users_use_case),
+    projection_use_case: GetAllUsersProjectionUseCase = Depends(
+        get_get_all_users_projection_use_case
+    ),
+    count_use_case: CountUsersUseCase = Depends(get_count_users_use_case),
+    encoder: ResponseEncoder = Depends(get_response_encoder),
 ):
-    users = await use_case.execute(limit=limit, offset=offset)
-    return [
-        UserResponse(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
+    after_id = None
+    descending = order == "desc"
+    if cursor is not None:
+        try:
+            after_id, descending = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    requested = parse_fields(fields)
+    if requested is None:
+        users = await use_case.execute(
+            limit=limit, offset=offset, after_id=after_id, descending=descending
         )
-        for user in users
-    ]
+        versions = [(user.id, user.updated_at) for user in users]
+    else:
+        try:
+            rows = await projection_use_case.execute(
+                fields=[*requested, "id", "updated_at"],
+                limit=limit,
+                offset=offset,
+                after_id=after_id,
+                descending=descending,
+            )
+        except ValidationError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        versions = [(row["id"], row["updated_at"]) for row in rows]
+
+    headers = {"ETag": versions_etag(versions)}
+    if versions and len(versions) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(versions[-1][0], descending)
+    if total is not None:
+        headers["X-Total-Count"] = str(await count_use_case.execute(mode=total))
+    if is_not_modified(if_none_match, None, headers["ETag"]):
+        return encoder.not_modified(headers)
+    if requested is None:
+        return await encoder.users(users, headers=headers)
+    return await encoder.payload([select_fields(row, requested) for row in rows], headers=headers)
 
 
-@router.put("/{user_id}", response_model=UserResponse)
+@router.put(
+    "/{user_id}",
+    response_model=UserResponse,
+    responses={412: {"description": "If-Match does not match the current version"}},
+)
 async def update_user(
     user_id: int,
     request: UserUpdateRequest,
+    if_match: Optional[str] = Header(None),
     use_case: UpdateUserUseCase = Depends(get_update_user_use_case),
 ):
+    expected_updated_at = None
+    if if_match is not None and if_match.strip() != "*":
+        versions = filter(None, (parse_user_etag(tag) for tag in if_match.split(",")))
+        matching = [updated_at for tag_id, updated_at in versions if tag_id == user_id]
+        if not matching:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED, detail="ETag does not match"
+            )
+        expected_updated_at = matching[0]
+
     try:
-        user = await use_case.execute(user_id=user_id, email=request.email, name=request.name)
-        return UserResponse(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
+        user = await use_case.execute(
+            user_id=user_id,
+            email=request.email,
+            name=request.name,
+            expected_updated_at=expected_updated_at,
         )
+        return user_json_response(user, headers=user_headers(user.id, user.updated_at))
     except EntityNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except EntityAlreadyExists as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
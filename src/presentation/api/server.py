@@ -0,0 +1,78 @@
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import uvicorn
+
+from src.infrastructure.config import Settings, settings
+from src.infrastructure.metrics import MULTIPROCESS_ENV
+
+
+logger = logging.getLogger(__name__)
+
+APP = "src.presentation.api.app:app"
+
+
+@dataclass(frozen=True)
+class PoolSizing:
+    min_size: int
+    max_size: int
+
+
+def pool_sizing(settings: Settings) -> PoolSizing:
+    if settings.database_connection_budget <= 0:
+        return PoolSizing(settings.database_pool_min_size, settings.database_pool_max_size)
+
+    # The budget is per Postgres server (per shard when sharded); a worker's LISTEN
+    # and EXPLAIN connections come out of its share.
+    uses_postgres = settings.user_repository_backend != "memory"
+    reserved = 0
+    if uses_postgres and settings.users_changes_enabled:
+        reserved += 1
+    if uses_postgres and settings.slow_query_log_enabled:
+        reserved += 1
+    max_size = settings.database_connection_budget // settings.app_workers - reserved
+    if max_size < 1:
+        raise ValueError(
+            f"DATABASE_CONNECTION_BUDGET={settings.database_connection_budget} is too small "
+            f"for {settings.app_workers} workers"
+        )
+    return PoolSizing(min(settings.database_pool_min_size, max_size), max_size)
+
+
+def uvicorn_options(settings: Settings) -> Dict[str, Any]:
+    return {
+        "host": settings.app_host,
+        "port": settings.app_port,
+        "workers": settings.app_workers,
+        "loop": settings.app_loop,
+        "http": settings.app_http,
+        "backlog": settings.app_backlog,
+        "timeout_keep_alive": settings.app_keep_alive_seconds,
+        # On SIGTERM uvicorn drains in-flight requests before the lifespan closes the pool.
+        "timeout_graceful_shutdown": settings.app_graceful_shutdown_seconds,
+    }
+
+
+def main() -> None:
+    sizing = pool_sizing(settings)
+    # Workers are separate processes that read settings from the environment again.
+    os.environ["DATABASE_POOL_MIN_SIZE"] = str(sizing.min_size)
+    os.environ["DATABASE_POOL_MAX_SIZE"] = str(sizing.max_size)
+    if settings.app_workers > 1 and MULTIPROCESS_ENV not in os.environ:
+        os.environ[MULTIPROCESS_ENV] = tempfile.mkdtemp(prefix="prometheus-")
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        "Starting %s worker(s), database pool %s..%s per worker",
+        settings.app_workers,
+        sizing.min_size,
+        sizing.max_size,
+    )
+    uvicorn.run(APP, **uvicorn_options(settings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from src.domain.entities.user import User
+from src.domain.entities.user_change import UserChange
+
+
+EXPORT_FIELDS = ["id", "email", "name", "created_at", "updated_at"]
+
+
+def _user_to_dict(user: User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+async def users_to_ndjson(users: AsyncIterator[User], chunk_size: int = 1000) -> AsyncIterator[str]:
+    lines: List[str] = []
+    async for user in users:
+        lines.append(json.dumps(_user_to_dict(user)))
+        if len(lines) >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def users_to_csv(users: AsyncIterator[User], chunk_size: int = 1000) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    rows = 0
+    async for user in users:
+        writer.writerow(_user_to_dict(user))
+        rows += 1
+        if rows >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def change_event_id(change: UserChange) -> str:
+    return f"{change.changed_at.isoformat()}/{change.user_id}"
+
+
+def parse_change_event_id(event_id: str) -> Tuple[datetime, int]:
+    changed_at, _, user_id = event_id.rpartition("/")
+    return datetime.fromisoformat(changed_at), int(user_id)
+
+
+async def changes_to_sse(changes: AsyncIterator[Optional[UserChange]]) -> AsyncIterator[str]:
+    async for change in changes:
+        if change is None:
+            yield ": keep-alive\n\n"
+            continue
+        data = {"op": change.op, "id": change.user_id}
+        if change.user:
+            data["user"] = _user_to_dict(change.user)
+        yield f"id: {change_event_id(change)}\nevent: {change.op}\ndata: {json.dumps(data)}\n\n"
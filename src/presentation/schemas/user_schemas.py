@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import List, Literal, Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 
 
 class UserCreateRequest(BaseModel):
@@ -22,3 +22,66 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+
+# Response for ?fields=: only the requested keys are present.
+class UserPartialResponse(BaseModel):
+    id: Optional[int] = None
+    email: Optional[str] = None
+    name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class UserBatchCreateRequest(BaseModel):
+    users: List[UserCreateRequest] = Field(min_length=1)
+
+
+class UserBatchItemResult(BaseModel):
+    index: int
+    email: str
+    status: Literal["created", "duplicate"]
+    user: Optional[UserResponse] = None
+
+
+class UserBatchCreateResponse(BaseModel):
+    created: int
+    duplicates: int
+    results: List[UserBatchItemResult]
+
+
+class UserBatchUpdateItem(BaseModel):
+    id: int
+    email: Optional[EmailStr] = None
+    name: Optional[str] = None
+
+
+class UserBatchUpdateRequest(BaseModel):
+    users: List[UserBatchUpdateItem] = Field(min_length=1)
+
+
+class UserBatchUpdateItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "not_found", "conflict"]
+    user: Optional[UserResponse] = None
+
+
+class UserBatchUpdateResponse(BaseModel):
+    updated: int
+    not_found: int
+    conflicts: int
+    results: List[UserBatchUpdateItemResult]
+
+
+class UserBatchDeleteRequest(BaseModel):
+    ids: List[int] = Field(min_length=1)
+
+
+class UserBatchDeleteItemResult(BaseModel):
+    id: int
+    status: Literal["deleted", "not_found"]
+
+
+class UserBatchDeleteResponse(BaseModel):
+    deleted: int
+    not_found: int
+    results: List[UserBatchDeleteItemResult]
@@ -3,9 +3,28 @@ from httpx import AsyncClient, ASGITransport
 from fastapi import FastAPI
 
 from src.infrastructure.database.connection import db_connection
+from src.presentation.api.app import lifespan
 from src.presentation.api.routes.users import router as users_router
 
 
+@pytest_asyncio.fixture(scope="function")
+async def db():
+    if db_connection.pool:
+        db_connection.pool = None
+    
+    await db_connection.connect()
+    
+    async with db_connection.pool.acquire() as conn:
+        await conn.execute("truncate table users, user_tombstones cascade;")
+    
+    yield db_connection
+    
+    # An app lifespan in the test closes the pool on the way out.
+    await db_connection.connect()
+    async with db_connection.pool.acquire() as conn:
+        await conn.execute("truncate table users, user_tombstones cascade;")
+
+
 @pytest_asyncio.fixture(scope="function")
 async def client():
     if db_connection.pool:
@@ -13,19 +32,19 @@ async def client():
     
     await db_connection.connect()
     
-    app = FastAPI(title="Test App")
+    app = FastAPI(title="Test App", lifespan=lifespan)
     app.include_router(users_router)
     
     pool = db_connection.pool
     async with pool.acquire() as conn:
-        await conn.execute("truncate table users cascade;")
+        await conn.execute("truncate table users, user_tombstones cascade;")
     
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test"
-    ) as ac:
-        yield ac
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as ac:
+            yield ac
     
-    async with pool.acquire() as conn:
-        await conn.execute("truncate table users cascade;")
-
+        async with pool.acquire() as conn:
+            await conn.execute("truncate table users, user_tombstones cascade;")
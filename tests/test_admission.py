@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.infrastructure.admission import AdmissionController, Overloaded
+from src.presentation.api.middleware import AdmissionMiddleware
+
+
+async def test_queue_full_is_rejected_immediately():
+    controller = AdmissionController(initial_limit=1, queue_sizes={"read": 1}, queue_timeout=5)
+    await controller.acquire("read")
+    queued = asyncio.create_task(controller.acquire("read"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as error:
+        await controller.acquire("read")
+
+    assert error.value.reason == "queue_full"
+    assert controller.shed == 1
+    controller.release(0.01)
+    await queued
+    assert controller.in_flight == 1
+
+
+async def test_writes_are_admitted_before_queued_reads():
+    controller = AdmissionController(initial_limit=1, max_limit=1, queue_timeout=5)
+    await controller.acquire("write")
+    admitted = []
+
+    async def request(priority):
+        await controller.acquire(priority)
+        admitted.append(priority)
+
+    tasks = [asyncio.create_task(request(priority)) for priority in ("read", "write")]
+    await asyncio.sleep(0)
+    assert controller.queue_depth("read") == 1 and controller.queue_depth("write") == 1
+
+    controller.release(0.01)
+    await asyncio.sleep(0.01)
+    assert admitted == ["write"]
+    controller.release(0.01)
+    await asyncio.gather(*tasks)
+    assert admitted == ["write", "read"]
+
+
+async def test_waiting_past_queue_timeout_is_shed():
+    controller = AdmissionController(initial_limit=1, queue_timeout=0.01)
+    await controller.acquire("write")
+
+    with pytest.raises(Overloaded) as error:
+        await controller.acquire("read")
+
+    assert error.value.reason == "timeout"
+    assert controller.queue_depth("read") == 0
+
+
+def test_limit_grows_additively_and_shrinks_multiplicatively():
+    now = [0.0]
+    controller = AdmissionController(
+        initial_limit=10, min_limit=2, latency_target=0.1, decrease_factor=0.5, clock=lambda: now[0]
+    )
+    controller.in_flight = 20
+
+    for _ in range(10):
+        controller.release(0.01)
+    assert 10.9 < controller.limit < 11.0
+
+    controller.release(1.0)
+    limit = controller.limit
+    controller.release(1.0)
+    assert controller.limit == limit
+
+    now[0] = 1.0
+    controller.release(1.0)
+    assert controller.limit == limit / 2
+
+
+async def test_middleware_returns_503_with_retry_after_when_shedding():
+    release = asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/users/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    controller = AdmissionController(initial_limit=1, queue_sizes={"read": 0})
+    app.add_middleware(
+        AdmissionMiddleware, controller=controller, prefixes=("/users",), retry_after=2
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        pending = asyncio.create_task(client.get("/users/slow"))
+        await asyncio.sleep(0.01)
+
+        shed = await client.get("/users/slow")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "2"
+        assert (await client.get("/health")).status_code == 200
+
+        release.set()
+        assert (await pending).status_code == 200
+    assert controller.in_flight == 0
@@ -0,0 +1,37 @@
+import asyncio
+
+from src.domain.entities.user import User
+from src.infrastructure.repositories.batching_user_repository import BatchingUserRepository
+from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+
+
+async def test_concurrent_lookups_share_one_query(db):
+    repository = BatchingUserRepository(PostgresUserRepository(db))
+    created = await repository.create_many(
+        [User(id=None, email=f"burst{i}@example.com", name=f"Burst {i}") for i in range(3)]
+    )
+
+    users = await asyncio.gather(
+        *(repository.get_by_id(user.id) for user in created),
+        repository.get_by_id(created[0].id),
+        repository.get_by_id(999999),
+    )
+
+    assert [user.email for user in users[:4]] == [
+        "burst0@example.com", "burst1@example.com", "burst2@example.com", "burst0@example.com",
+    ]
+    assert users[4] is None
+    assert repository.stats()["by_id"] == {"loads": 5, "batches": 1}
+
+
+async def test_email_lookups_are_case_insensitive(db):
+    repository = BatchingUserRepository(PostgresUserRepository(db))
+    created = await repository.create(User(id=None, email="mixed@example.com", name="Mixed"))
+
+    found, missing = await asyncio.gather(
+        repository.get_by_email("MIXED@example.com"),
+        repository.get_by_email("nobody@example.com"),
+    )
+
+    assert found.id == created.id
+    assert missing is None
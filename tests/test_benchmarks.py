@@ -0,0 +1,53 @@
+from benchmarks.compare import compare_results
+from benchmarks.encoding import run_encoding_benchmark
+from benchmarks.load import EndpointStats, percentile, summarize
+from benchmarks.serialization import run_serialization_benchmark
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_summarize_reports_throughput_and_percentiles():
+    summary = summarize({"get": EndpointStats(latencies=[0.001, 0.002, 0.003], errors=1)}, 2.0)
+
+    assert summary["get"]["requests"] == 3
+    assert summary["get"]["errors"] == 1
+    assert summary["get"]["throughput_rps"] == 1.5
+    assert summary["get"]["p50_ms"] == 2.0
+
+
+def test_compare_results_flags_latency_and_throughput_regressions():
+    baseline = {
+        "get": {"p95_ms": 10.0, "throughput_rps": 1000.0},
+        "list": {"p95_ms": 20.0, "throughput_rps": 500.0},
+    }
+    current = {
+        "get": {"p95_ms": 10.5, "throughput_rps": 980.0},
+        "list": {"p95_ms": 25.0, "throughput_rps": 400.0},
+    }
+
+    regressions = compare_results(baseline, current, threshold=0.10)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("list:") for regression in regressions)
+
+
+async def test_serialization_benchmark_paths_return_identical_bodies():
+    results = await run_serialization_benchmark(rows=10, iterations=2)
+
+    assert results["legacy"]["bytes"] == results["fast"]["bytes"]
+    assert results["speedup"]["mean"] > 0
+
+
+async def test_encoding_benchmark_reports_smaller_compressed_bodies():
+    results = await run_encoding_benchmark(rows=50, iterations=2)
+
+    assert results["json"]["ratio"] == 1.0
+    assert results["json+zstd"]["bytes"] < results["json"]["bytes"]
+    assert results["msgpack"]["bytes"] < results["json"]["bytes"]
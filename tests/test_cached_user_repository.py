@@ -0,0 +1,69 @@
+import pytest_asyncio
+
+from src.domain.entities.user import User
+from src.infrastructure.repositories.cached_user_repository import CachedUserRepository
+from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+
+
+@pytest_asyncio.fixture(scope="function")
+async def repository(db):
+    return CachedUserRepository(PostgresUserRepository(db), max_size=100, ttl=60.0)
+
+
+async def test_get_by_id_is_served_from_cache(repository: CachedUserRepository):
+    user = await repository.create(User(id=None, email="cached@example.com", name="Cached"))
+    repository._by_id.clear()
+
+    first = await repository.get_by_id(user.id)
+    second = await repository.get_by_id(user.id)
+
+    assert first == second
+    assert repository.stats()["by_id"]["misses"] == 1
+    assert repository.stats()["by_id"]["hits"] == 1
+
+
+async def test_cached_user_is_not_shared_with_callers(repository: CachedUserRepository):
+    user = await repository.create(User(id=None, email="copy@example.com", name="Original"))
+
+    fetched = await repository.get_by_id(user.id)
+    fetched.name = "Mutated"
+
+    assert (await repository.get_by_id(user.id)).name == "Original"
+
+
+async def test_negative_email_lookup_is_invalidated_on_create(repository: CachedUserRepository):
+    assert await repository.get_by_email("late@example.com") is None
+    assert await repository.get_by_email("late@example.com") is None
+    assert repository.stats()["by_email"]["hits"] == 1
+
+    created = await repository.create(User(id=None, email="late@example.com", name="Late"))
+
+    assert await repository.get_by_email("LATE@example.com") == created
+
+
+async def test_update_invalidates_old_email(repository: CachedUserRepository):
+    user = await repository.create(User(id=None, email="old@example.com", name="Renamed"))
+    await repository.get_by_email("old@example.com")
+
+    await repository.update(user.id, email="new@example.com")
+
+    assert await repository.get_by_email("old@example.com") is None
+    assert (await repository.get_by_email("new@example.com")).id == user.id
+
+
+async def test_delete_invalidates_cached_user(repository: CachedUserRepository):
+    user = await repository.create(User(id=None, email="gone@example.com", name="Gone"))
+    await repository.get_by_id(user.id)
+
+    assert await repository.delete(user.id)
+
+    assert await repository.get_by_id(user.id) is None
+    assert await repository.get_by_email("gone@example.com") is None
+
+
+async def test_get_version_is_answered_from_cache(repository: CachedUserRepository):
+    user = await repository.create(User(id=None, email="version@example.com", name="Version"))
+
+    assert await repository.get_version(user.id) == user.updated_at
+    assert repository.stats()["by_id"]["hits"] == 1
+    assert await repository.get_version(user.id + 1000) is None
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+
+import pytest_asyncio
+
+from src.application.use_cases.user_use_cases import StreamUserChangesUseCase
+from src.domain.entities.user import User
+from src.domain.entities.user_change import UserChange
+from src.infrastructure.database.change_feed import PostgresUserChangeFeed
+from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from src.presentation.api.streaming import changes_to_sse, parse_change_event_id
+
+
+@pytest_asyncio.fixture(scope="function")
+async def feed(db):
+    feed = PostgresUserChangeFeed([db.connect_kwargs()], queue_size=10, heartbeat=5.0)
+    await feed.start()
+    yield feed
+    await feed.stop()
+
+
+async def next_change(changes):
+    return await asyncio.wait_for(changes.__anext__(), timeout=5.0)
+
+
+async def test_feed_delivers_trigger_notifications(db, feed):
+    repository = PostgresUserRepository(db)
+    subscription = feed.subscribe()
+
+    user = await repository.create(User(id=None, email="feed@example.com", name="Feed"))
+    await repository.update(user.id, name="Renamed")
+    await repository.delete(user.id)
+
+    inserted = await next_change(subscription)
+    updated = await next_change(subscription)
+    deleted = await next_change(subscription)
+    assert (inserted.op, inserted.user) == ("insert", user)
+    assert (updated.op, updated.user.name) == ("update", "Renamed")
+    assert (deleted.op, deleted.user_id, deleted.user) == ("delete", user.id, None)
+    await subscription.aclose()
+    assert feed.subscribers == 0
+
+
+async def test_slow_subscriber_is_dropped(db, feed):
+    feed.queue_size = 2
+    slow = feed.subscribe()
+    repository = PostgresUserRepository(db)
+
+    await repository.create_many(
+        [User(id=None, email=f"slow{i}@example.com", name="Slow") for i in range(3)]
+    )
+    await asyncio.sleep(0.2)
+
+    assert feed.dropped == 1
+    assert feed.subscribers == 0
+    assert [change async for change in slow] == []
+
+
+async def test_stream_catches_up_from_updated_at_before_live_events(db, feed):
+    repository = PostgresUserRepository(db)
+    old = await repository.create(User(id=None, email="old@example.com", name="Old"))
+    first = await repository.create(User(id=None, email="first@example.com", name="First"))
+    second = await repository.create(User(id=None, email="second@example.com", name="Second"))
+    use_case = StreamUserChangesUseCase(repository, feed, batch_size=1)
+
+    changes = use_case.execute(since=old.updated_at, after_id=old.id)
+    assert [(await next_change(changes)).user_id for _ in range(2)] == [first.id, second.id]
+
+    live = await repository.create(User(id=None, email="live@example.com", name="Live"))
+    assert (await next_change(changes)).user == live
+    await changes.aclose()
+    assert feed.subscribers == 0
+
+
+async def test_stream_catch_up_includes_deletes_from_tombstones(db, feed):
+    repository = PostgresUserRepository(db)
+    old = await repository.create(User(id=None, email="old@example.com", name="Old"))
+    gone = await repository.create(User(id=None, email="gone@example.com", name="Gone"))
+    kept = await repository.create(User(id=None, email="kept@example.com", name="Kept"))
+    await repository.delete(gone.id)
+    use_case = StreamUserChangesUseCase(repository, feed, batch_size=1)
+
+    changes = use_case.execute(since=old.updated_at, after_id=old.id)
+    caught_up = [await next_change(changes) for _ in range(2)]
+    assert [(change.op, change.user_id) for change in caught_up] == [
+        ("insert", kept.id),
+        ("delete", gone.id),
+    ]
+    await changes.aclose()
+
+
+async def test_sse_event_ids_resume_the_stream():
+    change = UserChange(op="delete", user_id=7, changed_at=datetime(2024, 5, 1, 12, 30, 0, 123456))
+
+    async def changes():
+        yield None
+        yield change
+
+    events = [event async for event in changes_to_sse(changes())]
+
+    assert events[0] == ": keep-alive\n\n"
+    assert events[1].startswith("id: 2024-05-01T12:30:00.123456/7\nevent: delete\n")
+    assert parse_change_event_id("2024-05-01T12:30:00.123456/7") == (change.changed_at, 7)
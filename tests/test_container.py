@@ -0,0 +1,56 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.infrastructure.config import Settings
+from src.infrastructure.database.connection import db_connection
+from src.infrastructure.repositories.batching_user_repository import BatchingUserRepository
+from src.infrastructure.repositories.cached_user_repository import CachedUserRepository
+from src.infrastructure.repositories.in_memory_user_repository import InMemoryUserRepository
+from src.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from src.presentation.api import app as app_module
+from src.presentation.api.app import create_app
+from src.presentation.api.container import Container
+
+
+def test_container_builds_postgres_stack_by_default():
+    container = Container(Settings(), db_connection)
+
+    assert isinstance(container.user_repository, PostgresUserRepository)
+    assert container.get_user.user_repository is container.user_repository
+    assert container.in_memory_repository is None
+
+
+def test_container_stacks_loader_and_cache_from_settings():
+    container = Container(
+        Settings(user_repository_backend="memory", user_loader_enabled=True, user_cache_enabled=True),
+        db_connection,
+    )
+
+    assert isinstance(container.user_repository, CachedUserRepository)
+    assert isinstance(container.user_repository.repository, BatchingUserRepository)
+    assert container.user_repository.repository.repository is container.in_memory_repository
+    assert isinstance(container.in_memory_repository, InMemoryUserRepository)
+
+
+async def test_lifespan_builds_container_once(monkeypatch):
+    monkeypatch.setattr(app_module, "settings", Settings(user_repository_backend="memory"))
+    app = create_app()
+
+    async with app.router.lifespan_context(app):
+        container = app.state.container
+        assert container.startup_seconds is not None
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            created = await client.post("/users/", json={"email": "c@example.com", "name": "C"})
+            fetched = await client.get(f"/users/{created.json()['id']}")
+
+        assert fetched.status_code == 200
+        assert app.state.container is container
+        assert len(container.in_memory_repository) == 1
+
+
+async def test_requests_fail_without_a_started_container():
+    app = create_app()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        with pytest.raises(RuntimeError):
+            await client.get("/users/1")
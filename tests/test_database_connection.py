@@ -0,0 +1,78 @@
+import pytest
+
+from src.infrastructure.config import settings
+from src.infrastructure.database.connection import DatabaseConnection
+from src.infrastructure.database.statements import StatementRegistry
+
+
+PREPARED_STATEMENTS_QUERY = "select statement from pg_prepared_statements"
+
+
+async def test_registered_statements_are_prepared_on_new_connections(db):
+    registry = StatementRegistry()
+    count_users = registry.register("test_count_users", "select count(*) as total from users")
+    connection = DatabaseConnection(statements=registry)
+    await connection.connect()
+    try:
+        await connection.warm_up()
+
+        prepared = {row["statement"] for row in await connection.fetch(PREPARED_STATEMENTS_QUERY)}
+        assert count_users.sql in prepared
+
+        row = await connection.fetchrow(count_users)
+        assert row["total"] == 0
+    finally:
+        await connection.disconnect()
+
+
+class FlakyPool:
+    def __init__(self, pool, fail_on: int):
+        self.pool = pool
+        self.fail_on = fail_on
+        self.acquired = 0
+
+    async def acquire(self, timeout=None):
+        if self.acquired + 1 == self.fail_on:
+            raise TimeoutError
+        self.acquired += 1
+        return await self.pool.acquire(timeout=timeout)
+
+    async def release(self, connection):
+        await self.pool.release(connection)
+
+
+async def test_warm_up_releases_acquired_connections_when_an_acquire_fails(db, monkeypatch):
+    monkeypatch.setattr(settings, "database_pool_min_size", 3)
+    monkeypatch.setattr(settings, "database_pool_max_size", 3)
+    connection = DatabaseConnection(statements=StatementRegistry())
+    await connection.connect()
+    pool = connection.pool
+    connection.pool = FlakyPool(pool, fail_on=2)
+    try:
+        with pytest.raises(TimeoutError):
+            await connection.warm_up()
+        assert connection.pool.acquired == 1
+        assert pool.get_idle_size() == pool.get_size()
+    finally:
+        connection.pool = pool
+        await connection.disconnect()
+
+
+async def test_statement_queries_run_without_registration(db):
+    connection = DatabaseConnection(statements=StatementRegistry())
+    await connection.connect()
+    try:
+        late = StatementRegistry().register("test_late", "select $1::int + 1 as value")
+        assert (await connection.fetchrow(late, 41))["value"] == 42
+        assert await connection.execute(late, 1) == "SELECT 1"
+    finally:
+        await connection.disconnect()
+
+
+def test_registry_rejects_conflicting_sql():
+    registry = StatementRegistry()
+    registry.register("test_statement", "select 1")
+    registry.register("test_statement", "select 1")
+
+    with pytest.raises(ValueError):
+        registry.register("test_statement", "select 2")
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from src.infrastructure.dataloader import DataLoader
+
+
+class RecordingBatchLoad:
+    def __init__(self):
+        self.calls: List[List[int]] = []
+
+    async def __call__(self, keys: List[int]) -> Dict[int, str]:
+        self.calls.append(sorted(keys))
+        await asyncio.sleep(0)
+        return {key: f"value-{key}" for key in keys if key > 0}
+
+
+async def test_loads_in_same_tick_are_coalesced():
+    batch_load = RecordingBatchLoad()
+    loader = DataLoader(batch_load)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(-1))
+
+    assert results == ["value-1", "value-2", None]
+    assert batch_load.calls == [[-1, 1, 2]]
+
+
+async def test_identical_in_flight_keys_are_deduplicated():
+    batch_load = RecordingBatchLoad()
+    loader = DataLoader(batch_load)
+
+    first = asyncio.ensure_future(loader.load(7))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(loader.load(7))
+
+    assert await asyncio.gather(first, second) == ["value-7", "value-7"]
+    assert batch_load.calls == [[7]]
+
+
+async def test_window_collects_loads_across_ticks():
+    batch_load = RecordingBatchLoad()
+    loader = DataLoader(batch_load, window=0.01)
+
+    async def delayed_load(key: int) -> str:
+        await asyncio.sleep(0)
+        return await loader.load(key)
+
+    await asyncio.gather(loader.load(1), delayed_load(2))
+
+    assert batch_load.calls == [[1, 2]]
+
+
+async def test_max_batch_size_splits_batches():
+    batch_load = RecordingBatchLoad()
+    loader = DataLoader(batch_load, max_batch_size=2)
+
+    await asyncio.gather(*(loader.load(key) for key in (1, 2, 3)))
+
+    assert batch_load.calls == [[1, 2], [3]]
+
+
+async def test_batch_errors_reach_every_waiter():
+    async def failing_batch_load(keys: List[int]) -> Dict[int, str]:
+        raise RuntimeError("database is down")
+
+    loader = DataLoader(failing_batch_load)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
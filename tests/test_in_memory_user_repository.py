@@ -0,0 +1,103 @@
+import pytest
+
+from src.domain.entities.user import User
+from src.domain.exceptions import EntityAlreadyExists
+from src.infrastructure.repositories.in_memory_user_repository import InMemoryUserRepository
+
+
+@pytest.fixture
+def repository():
+    return InMemoryUserRepository()
+
+
+async def create_users(repository: InMemoryUserRepository, count: int):
+    return await repository.create_many(
+        [User(id=None, email=f"user{i}@example.com", name=f"User {i}") for i in range(count)]
+    )
+
+
+async def test_create_enforces_case_insensitive_email_uniqueness(repository):
+    created = await repository.create(User(id=None, email="Unique@Example.com", name="Unique"))
+
+    assert created.id == 1
+    assert created.created_at is not None
+    assert await repository.create(User(id=None, email="unique@example.com", name="Again")) is None
+    assert (await repository.get_by_email("UNIQUE@example.com")).id == created.id
+
+
+async def test_get_all_supports_offset_and_cursor_scans(repository):
+    users = await create_users(repository, 5)
+    await repository.delete(users[2].id)
+    ids = [user.id for user in users if user.id != users[2].id]
+
+    assert [u.id for u in await repository.get_all(limit=2, offset=1)] == ids[1:3]
+    assert [u.id for u in await repository.get_all(limit=2, offset=1, descending=True)] == ids[::-1][1:3]
+    assert [u.id for u in await repository.get_all(limit=2, after_id=users[1].id)] == ids[2:4]
+    assert [u.id for u in await repository.get_all(limit=2, after_id=users[3].id, descending=True)] == [
+        users[1].id, users[0].id,
+    ]
+    assert await repository.get_all(limit=2, offset=10) == []
+
+
+async def test_update_keeps_email_index_consistent(repository):
+    first, second = await create_users(repository, 2)
+
+    with pytest.raises(EntityAlreadyExists):
+        await repository.update(first.id, email=second.email)
+
+    updated = await repository.update(first.id, email="renamed@example.com", name="Renamed")
+    assert updated.name == "Renamed"
+    assert await repository.get_by_email(first.email) is None
+    assert (await repository.get_by_email("renamed@example.com")).id == first.id
+    assert await repository.update(999, name="Missing") is None
+
+
+async def test_returned_users_do_not_alias_stored_state(repository):
+    created = await repository.create(User(id=None, email="alias@example.com", name="Alias"))
+    created.name = "Mutated"
+
+    assert (await repository.get_by_id(created.id)).name == "Alias"
+
+
+async def test_projections_return_only_requested_fields(repository):
+    await create_users(repository, 3)
+
+    assert await repository.get_projection(2, ("id", "email")) == {"id": 2, "email": "user1@example.com"}
+    assert await repository.get_projection(9, ("id",)) is None
+    page = await repository.get_all_projected(("name",), limit=2, after_id=1)
+    assert page == [{"name": "User 1"}, {"name": "User 2"}]
+
+
+async def test_iter_all_streams_in_id_order(repository):
+    await create_users(repository, 5)
+
+    emails = [user.email async for user in repository.iter_all(batch_size=2)]
+
+    assert emails == [f"user{i}@example.com" for i in range(5)]
+
+
+async def test_snapshot_round_trip(repository, tmp_path):
+    users = await create_users(repository, 3)
+    await repository.delete(users[-1].id)
+    path = str(tmp_path / "users.snapshot.gz")
+    repository.save_snapshot(path)
+
+    restored = InMemoryUserRepository(snapshot_path=path)
+    restored.load_snapshot()
+
+    assert len(restored) == 2
+    assert await restored.get_by_id(users[0].id) == users[0]
+    created = await restored.create(User(id=None, email="next@example.com", name="Next"))
+    assert created.id == users[-1].id + 1
+
+
+async def test_search_matches_postgres_ranking(repository):
+    await create_users(repository, 12)
+
+    exact = await repository.search("user 1", limit=3)
+    assert [(rank, user.name) for rank, user in exact] == [
+        (0, "User 1"), (1, "User 10"), (1, "User 11"),
+    ]
+    assert await repository.search("user 1", limit=3, after=(1, exact[-1][1].id)) == []
+    assert len(await repository.search("ser", prefix=True)) == 0
+    assert len(await repository.search("ser")) == 12
@@ -0,0 +1,66 @@
+import re
+
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from src.infrastructure.config import settings
+from src.presentation.api.app import create_app
+
+
+@pytest_asyncio.fixture(scope="function")
+async def app_client(db):
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+
+async def test_metrics_exposes_route_and_query_series(app_client: AsyncClient):
+    create_response = await app_client.post(
+        "/users/", json={"email": "metrics@example.com", "name": "Metrics"}
+    )
+    await app_client.get(f"/users/{create_response.json()['id']}")
+    await app_client.get("/users/999999")
+
+    response = await app_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/users/{user_id}",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/users/{user_id}",status="404"}' in body
+    assert 'db_query_duration_seconds_count{operation="fetchrow",statement="users_get_by_id"}' in body
+    assert "db_pool_acquire_duration_seconds_count" in body
+    assert "db_pool_size" in body
+
+
+async def test_projections_get_their_own_statement_series(app_client: AsyncClient):
+    created = await app_client.post("/users/", json={"email": "proj@example.com", "name": "P"})
+    user_id = created.json()["id"]
+    await app_client.get(f"/users/{user_id}", params={"fields": "id"})
+    await app_client.get(f"/users/{user_id}", params={"fields": "email,name"})
+
+    body = (await app_client.get("/metrics")).text
+    statements = set(re.findall(r'statement="(users_get_by_id_projected[^"]*)"', body))
+    assert len(statements) == 2
+
+
+async def test_slow_queries_endpoint_lists_worst_statements(app_client: AsyncClient, monkeypatch):
+    assert (await app_client.get("/debug/slow-queries")).status_code == 404
+
+    monkeypatch.setattr(settings, "slow_query_log_enabled", True)
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_sample_rate", 0)
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/users/999999")
+            hidden = await client.get("/debug/slow-queries")
+            monkeypatch.setattr(settings, "debug", True)
+            response = await client.get("/debug/slow-queries", params={"order_by": "calls"})
+
+    assert hidden.status_code == 404
+    assert response.status_code == 200
+    statements = {item["statement"]: item for item in response.json()}
+    assert statements["users_get_by_id"]["calls"] == 1
+    assert statements["users_get_by_id"]["param_types"] == ["int"]
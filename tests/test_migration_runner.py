@@ -0,0 +1,153 @@
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.config import settings
+from src.infrastructure.database.migration_runner import (
+    MigrationRunner,
+    concurrent_index_name,
+    is_non_transactional,
+    split_statements,
+)
+
+
+TABLE = "migration_runner_items"
+
+
+async def connect():
+    return await asyncpg.connect(
+        host=settings.database_host,
+        port=settings.database_port,
+        database=settings.database_name,
+        user=settings.database_user,
+        password=settings.database_password,
+    )
+
+
+@pytest_asyncio.fixture
+async def conn(tmp_path):
+    conn = await connect()
+    await conn.execute(f"drop table if exists {TABLE}")
+    await conn.execute(f"create table {TABLE} (id serial primary key, name varchar(255) not null)")
+    await conn.execute(
+        f"insert into {TABLE} (name) select '  item ' || n from generate_series(1, 7) n"
+    )
+    yield conn
+    await conn.execute(f"drop table if exists {TABLE}")
+    await conn.execute("delete from schema_migrations where version like '9%_runner_%'")
+    await conn.close()
+
+
+def write_backfill(tmp_path, batch_size=3):
+    (tmp_path / "901_runner_trim.py").write_text(
+        "from src.infrastructure.database.backfill import Backfill\n"
+        f"BACKFILL = Backfill(table={TABLE!r}, batch_size={batch_size}, sleep_seconds=0, update="
+        f"'update {TABLE} set name = trim(name) where id > $1 and id <= $2')\n"
+    )
+
+
+def test_split_statements_ignores_semicolons_in_strings_and_comments():
+    sql = "-- migrate:no-transaction\ninsert into t values ('a;b'); -- x; y\nselect 1;"
+
+    assert split_statements(sql) == ["insert into t values ('a;b')", "select 1"]
+    assert is_non_transactional(sql)
+    assert not is_non_transactional("select 1;\n-- migrate:no-transaction")
+
+
+def test_split_statements_keeps_dollar_quotes_and_block_comments_whole():
+    sql = (
+        "/* setup; /* nested; */ still comment */ select 1;\n"
+        "do $body$ begin perform 1; end $body$;\n"
+        "create function f() returns int as $$ select 1; $$ language sql;\n"
+        "select $1 + 1;"
+    )
+
+    assert split_statements(sql) == [
+        "select 1",
+        "do $body$ begin perform 1; end $body$",
+        "create function f() returns int as $$ select 1; $$ language sql",
+        "select $1 + 1",
+    ]
+    assert concurrent_index_name(
+        "create unique index concurrently if not exists idx_a on t(a)"
+    ) == "idx_a"
+    assert concurrent_index_name("create index idx_a on t(a)") is None
+
+
+async def test_non_transactional_migration_builds_index_concurrently(conn, tmp_path):
+    (tmp_path / "900_runner_index.sql").write_text(
+        "-- migrate:no-transaction\n"
+        f"create index concurrently if not exists idx_runner_name on {TABLE}(name);\n"
+        f"create index concurrently if not exists idx_runner_name_id on {TABLE}(name, id);\n"
+    )
+
+    await MigrationRunner(str(tmp_path)).migrate()
+
+    indexes = await conn.fetch("select indexname from pg_indexes where tablename = $1", TABLE)
+    assert {"idx_runner_name", "idx_runner_name_id"} <= {row["indexname"] for row in indexes}
+
+
+async def test_failed_concurrent_index_is_dropped_and_rebuilt(conn, tmp_path):
+    await conn.execute(f"update {TABLE} set name = 'duplicate' where id <= 2")
+    (tmp_path / "903_runner_unique.sql").write_text(
+        "-- migrate:no-transaction\n"
+        f"create unique index concurrently if not exists idx_runner_unique on {TABLE}(name);\n"
+    )
+
+    with pytest.raises(asyncpg.UniqueViolationError):
+        await MigrationRunner(str(tmp_path)).migrate()
+    assert await conn.fetchval("select to_regclass('idx_runner_unique')") is None
+
+    # Simulate an INVALID leftover from an interrupted run.
+    with pytest.raises(asyncpg.UniqueViolationError):
+        await conn.execute(f"create unique index concurrently idx_runner_unique on {TABLE}(name)")
+    await conn.execute(f"update {TABLE} set name = 'unique' where id = 2")
+
+    await MigrationRunner(str(tmp_path)).migrate()
+
+    valid = await conn.fetchval(
+        "select indisvalid from pg_index where indexrelid = to_regclass('idx_runner_unique')"
+    )
+    assert valid is True
+
+
+async def test_backfill_runs_in_chunks_and_resumes_from_checkpoint(conn, tmp_path):
+    write_backfill(tmp_path)
+    await conn.execute(
+        "insert into schema_migrations (version, applied_at, checkpoint, rows_processed) "
+        "values ('901_runner_trim', null, 3, 3)"
+    )
+
+    await MigrationRunner(str(tmp_path)).migrate()
+
+    names = await conn.fetch(f"select id, name from {TABLE} order by id")
+    assert [row["name"].startswith(" ") for row in names] == [True] * 3 + [False] * 4
+    progress = await conn.fetchrow(
+        "select applied_at, checkpoint, rows_processed from schema_migrations where version = $1",
+        "901_runner_trim",
+    )
+    assert progress["applied_at"] is not None
+    assert progress["checkpoint"] == 7
+    assert progress["rows_processed"] == 7
+
+
+async def test_lock_timeout_fails_fast_instead_of_queueing(conn, tmp_path):
+    (tmp_path / "902_runner_alter.sql").write_text(
+        f"alter table {TABLE} add column if not exists note text;"
+    )
+    blocker = await connect()
+    try:
+        transaction = blocker.transaction()
+        await transaction.start()
+        await blocker.execute(f"lock table {TABLE} in access share mode")
+
+        with pytest.raises(asyncpg.LockNotAvailableError):
+            await MigrationRunner(str(tmp_path), lock_timeout_ms=100, lock_retries=0).migrate()
+        await transaction.rollback()
+    finally:
+        await blocker.close()
+
+    applied = await conn.fetchval(
+        "select count(*) from schema_migrations where version = '902_runner_alter'"
+    )
+    assert applied == 0
@@ -0,0 +1,82 @@
+import gzip
+from datetime import datetime
+
+import msgpack
+import zstandard
+
+from src.domain.entities.user import User
+from src.presentation.api.encoding import choose_content_encoding, prefers_msgpack
+from src.presentation.api.responses import ResponseEncoder
+
+
+def build_users(count: int):
+    now = datetime(2024, 1, 1, 12, 0)
+    return [
+        User(id=i, email=f"user{i}@example.com", name=f"User {i}", created_at=now, updated_at=now)
+        for i in range(1, count + 1)
+    ]
+
+
+def test_negotiation_honours_quality_values():
+    assert prefers_msgpack("application/msgpack")
+    assert prefers_msgpack("application/json;q=0.5, application/x-msgpack")
+    assert not prefers_msgpack("*/*")
+    assert not prefers_msgpack("application/json, application/msgpack;q=0.9")
+
+    assert choose_content_encoding("gzip, deflate, zstd") == "zstd"
+    assert choose_content_encoding("gzip, zstd;q=0.5") == "gzip"
+    assert choose_content_encoding("br, identity") is None
+    assert choose_content_encoding("*;q=0") is None
+
+
+async def test_small_bodies_are_not_compressed():
+    encoder = ResponseEncoder(accept_encoding="gzip", minimum_size=1024)
+
+    response = await encoder.users(build_users(1), headers={"ETag": '"abc"'})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+
+async def test_not_modified_carries_the_same_validator_as_the_full_response():
+    encoder = ResponseEncoder(accept_encoding="zstd", minimum_size=0)
+
+    full = await encoder.users(build_users(5), headers={"ETag": '"abc"'})
+    not_modified = encoder.not_modified({"ETag": '"abc"'})
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == full.headers["etag"] == 'W/"abc"'
+    assert not_modified.headers["vary"] == full.headers["vary"]
+    assert ResponseEncoder().not_modified({"ETag": '"abc"'}).headers["etag"] == '"abc"'
+
+
+async def test_msgpack_with_zstd_round_trips_and_weakens_etag():
+    users = build_users(50)
+    encoder = ResponseEncoder(
+        accept="application/msgpack", accept_encoding="zstd", minimum_size=0, offload_size=0
+    )
+
+    response = await encoder.users(users, headers={"ETag": '"abc"'})
+
+    assert response.media_type == "application/msgpack"
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.headers["etag"] == 'W/"abc"'
+    decoded = msgpack.unpackb(zstandard.ZstdDecompressor().decompressobj().decompress(response.body))
+    assert decoded[0] == {
+        "id": 1,
+        "email": "user1@example.com",
+        "name": "User 1",
+        "created_at": "2024-01-01T12:00:00",
+        "updated_at": "2024-01-01T12:00:00",
+    }
+    assert len(decoded) == 50
+
+
+async def test_gzip_payload_matches_json():
+    encoder = ResponseEncoder(accept_encoding="gzip", minimum_size=0)
+
+    response = await encoder.payload([{"email": "a@example.com"}] * 100)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == b"[" + b",".join([b'{"email":"a@example.com"}'] * 100) + b"]"
@@ -0,0 +1,57 @@
+import pytest
+
+from src.infrastructure.config import Settings
+from src.presentation.api.server import pool_sizing, uvicorn_options
+
+
+def test_pool_sizing_splits_budget_between_workers():
+    settings = Settings(
+        database_connection_budget=90,
+        app_workers=4,
+        database_pool_min_size=5,
+        users_changes_enabled=True,
+    )
+
+    sizing = pool_sizing(settings)
+
+    # 90 // 4 = 22 per worker, one of them for the change feed LISTEN.
+    assert (sizing.min_size, sizing.max_size) == (5, 21)
+    assert pool_sizing(settings.model_copy(update={"users_changes_enabled": False})).max_size == 22
+
+
+def test_pool_sizing_reserves_explain_connection_for_slow_query_log():
+    settings = Settings(
+        database_connection_budget=90,
+        app_workers=4,
+        users_changes_enabled=True,
+        slow_query_log_enabled=True,
+    )
+
+    assert pool_sizing(settings).max_size == 20
+    in_memory = settings.model_copy(update={"user_repository_backend": "memory"})
+    assert pool_sizing(in_memory).max_size == 22
+
+
+def test_pool_sizing_without_budget_keeps_configured_sizes():
+    settings = Settings(database_pool_min_size=2, database_pool_max_size=7, app_workers=8)
+
+    sizing = pool_sizing(settings)
+
+    assert (sizing.min_size, sizing.max_size) == (2, 7)
+
+
+def test_pool_sizing_rejects_budget_smaller_than_workers():
+    with pytest.raises(ValueError):
+        pool_sizing(Settings(database_connection_budget=8, app_workers=8))
+
+
+def test_uvicorn_options_expose_production_settings():
+    options = uvicorn_options(
+        Settings(app_workers=3, app_loop="uvloop", app_http="httptools", app_backlog=4096)
+    )
+
+    assert options["workers"] == 3
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["backlog"] == 4096
+    assert options["timeout_graceful_shutdown"] == 30
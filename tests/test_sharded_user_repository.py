@@ -0,0 +1,186 @@
+from urllib.parse import quote
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from src.domain.entities.user import User
+from src.domain.exceptions import EntityAlreadyExists
+from src.infrastructure.config import settings
+from src.infrastructure.database.migration_runner import MigrationRunner
+from src.infrastructure.database.sharding import ShardMap
+from src.infrastructure.repositories.sharded_user_repository import ShardedUserRepository
+
+
+SHARDS = 3
+
+
+def shard_dsn(index: int) -> str:
+    return (
+        f"postgresql://{quote(settings.database_user)}:{quote(settings.database_password)}@"
+        f"/{settings.database_name}_shard_{index}"
+        f"?host={quote(settings.database_host)}&port={settings.database_port}"
+    )
+
+
+@pytest_asyncio.fixture(scope="function")
+async def repository():
+    conn = await asyncpg.connect(
+        host=settings.database_host,
+        port=settings.database_port,
+        database=settings.database_name,
+        user=settings.database_user,
+        password=settings.database_password,
+    )
+    try:
+        existing = {row["datname"] for row in await conn.fetch("select datname from pg_database")}
+        for index in range(SHARDS):
+            if f"{settings.database_name}_shard_{index}" not in existing:
+                await conn.execute(f'create database "{settings.database_name}_shard_{index}"')
+    finally:
+        await conn.close()
+
+    dsns = [shard_dsn(index) for index in range(SHARDS)]
+    for dsn in dsns:
+        await MigrationRunner(dsn=dsn).migrate()
+
+    shard_map = ShardMap.from_dsns(dsns)
+    await shard_map.connect()
+    for shard in shard_map.shards:
+        await shard.execute("truncate table users, user_emails, user_tombstones")
+        await shard.execute("alter sequence users_id_seq increment by 1 restart with 1")
+    repository = ShardedUserRepository(shard_map)
+    await repository.prepare()
+
+    yield repository
+
+    await shard_map.disconnect()
+
+
+async def create_users(repository: ShardedUserRepository, count: int):
+    return await repository.create_many(
+        [User(id=None, email=f"user{i}@example.com", name=f"User {i}") for i in range(count)]
+    )
+
+
+async def test_users_are_created_on_the_shard_owning_their_id(repository):
+    users = await create_users(repository, 30)
+
+    assert len({user.id for user in users}) == 30
+    for index, shard in enumerate(repository.shard_map.shards):
+        ids = [row["id"] for row in await shard.fetch("select id from users")]
+        assert ids
+        assert all((user_id - 1) % SHARDS == index for user_id in ids)
+
+
+async def test_prepare_is_idempotent(repository):
+    before = await create_users(repository, 6)
+    await repository.prepare()
+    created = await repository.create(User(id=None, email="after@example.com", name="After"))
+
+    assert created.id not in {user.id for user in before}
+    assert await repository.get_by_id(created.id) == created
+
+
+async def test_email_uniqueness_and_lookup_across_shards(repository):
+    users = await create_users(repository, 10)
+
+    duplicate = await repository.create(User(id=None, email="USER3@example.com", name="Dup"))
+    assert duplicate is None
+    assert await repository.get_by_email("User7@Example.com") == users[7]
+    found = await repository.get_by_emails(["user1@example.com", "missing@example.com"])
+    assert found == [users[1]]
+
+    first, second = await repository.create_many(
+        [
+            User(id=None, email="x@example.com", name="X"),
+            User(id=None, email="X@example.com", name="Y"),
+        ]
+    )
+    assert first.name == "X"
+    assert second is None
+
+
+async def test_update_email_moves_the_index_entry(repository):
+    users = await create_users(repository, 10)
+    user = users[4]
+
+    updated = await repository.update(user.id, email="renamed@example.com")
+
+    assert updated.email == "renamed@example.com"
+    assert await repository.get_by_email("renamed@example.com") == updated
+    assert await repository.get_by_email(user.email) is None
+    recreated = await repository.create(User(id=None, email=user.email, name="Reuse"))
+    assert recreated is not None
+    with pytest.raises(EntityAlreadyExists):
+        await repository.update(user.id, email="user5@example.com")
+    assert (await repository.get_by_id(user.id)).email == "renamed@example.com"
+
+
+async def test_delete_releases_email(repository):
+    users = await create_users(repository, 3)
+
+    assert await repository.delete(users[0].id)
+    assert not await repository.delete(users[0].id)
+    assert await repository.get_by_email(users[0].email) is None
+    assert await repository.create(User(id=None, email=users[0].email, name="Again"))
+
+
+async def test_update_many_batches_email_changes_across_shards(repository):
+    users = await create_users(repository, 4)
+
+    outcomes = await repository.update_many([
+        (users[0].id, "moved0@example.com", None),
+        (users[1].id, users[2].email, None),
+        (users[2].id, None, "Renamed"),
+        (users[3].id, "same@example.com", None),
+        (999999, "ghost@example.com", None),
+    ])
+
+    assert [status for status, _ in outcomes] == [
+        "updated", "conflict", "updated", "updated", "not_found"
+    ]
+    assert await repository.get_by_email("moved0@example.com") == outcomes[0][1]
+    assert await repository.get_by_email(users[0].email) is None
+    assert (await repository.get_by_id(users[2].id)).name == "Renamed"
+    assert await repository.create(User(id=None, email=users[0].email, name="Reuse"))
+    assert await repository.create(User(id=None, email="ghost@example.com", name="Ghost"))
+
+
+async def test_reconcile_emails_releases_only_old_stale_reservations(repository):
+    user = await repository.create(User(id=None, email="owner@example.com", name="Owner"))
+    shard = repository._shard_for_email("abandoned@example.com")
+    await shard.execute(
+        "insert into user_emails (email, user_id, reserved_at) "
+        "values ('abandoned@example.com', $1, now() - interval '1 hour')",
+        user.id,
+    )
+    in_flight = repository._shard_for_email("in-flight@example.com")
+    await in_flight.execute(
+        "insert into user_emails (email, user_id) values ('in-flight@example.com', $1)", user.id
+    )
+    owner_shard = repository._shard_for_email(user.email)
+    await owner_shard.execute("update user_emails set reserved_at = now() - interval '1 hour'")
+
+    assert await repository.reconcile_emails(min_age=60, batch_size=1) == 1
+
+    remaining = set()
+    for index_shard in repository.shard_map.shards:
+        rows = await index_shard.fetch("select email from user_emails")
+        remaining |= {row["email"] for row in rows}
+    assert remaining == {"owner@example.com", "in-flight@example.com"}
+
+
+async def test_get_all_merges_shards_in_id_order(repository):
+    users = await create_users(repository, 25)
+    ids = sorted(user.id for user in users)
+
+    assert [user.id for user in await repository.get_all(limit=5, offset=3)] == ids[3:8]
+    assert [user.id for user in await repository.get_all(limit=4, after_id=ids[10])] == ids[11:15]
+    assert [
+        user.id for user in await repository.get_all(limit=4, after_id=ids[10], descending=True)
+    ] == ids[6:10][::-1]
+    assert [user.id async for user in repository.iter_all(batch_size=7)] == ids
+    assert await repository.count() == 25
+    page = await repository.get_all_projected(("email",), limit=3, offset=2)
+    assert page == [{"email": user.email} for user in sorted(users, key=lambda u: u.id)[2:5]]
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from src.infrastructure.database.slow_query_log import SlowQueryLog, fingerprint, normalize_sql
+
+
+def test_normalize_sql_replaces_literals_but_keeps_placeholders():
+    sql = "select *\n  from users where id = $1 and name = 'O''Brien' limit 10"
+
+    assert normalize_sql(sql) == "select * from users where id = $1 and name = ? limit ?"
+    assert fingerprint(normalize_sql(sql)) == fingerprint(
+        normalize_sql("SELECT * FROM users WHERE id = $1 AND name = 'x' LIMIT 5")
+    )
+
+
+def test_observe_aggregates_by_fingerprint_above_threshold(caplog):
+    slow_query_log = SlowQueryLog(threshold=0.1, max_statements=2)
+
+    slow_query_log.observe("a", "select 1 from users where id = $1", [7], 0.05, 0.0)
+    slow_query_log.observe("a", "select 1 from users where id = $1", [7], 0.3, 0.01)
+    slow_query_log.observe("a", "select 2 from users where id = $1", [8], 0.5, 0.0)
+    slow_query_log.observe("b", "select email from users", [], 0.2, 0.0)
+    slow_query_log.observe("c", "select name from users", [], 0.9, 0.0)
+
+    top = slow_query_log.top()
+    assert [stats.statement for stats in top] == ["c", "a"]
+    assert top[1].calls == 2
+    assert top[1].max_ms == 500.0
+    assert top[1].param_types == ["int"]
+    assert '"event": "slow_query"' in caplog.text
+    assert '"param_types": ["int"]' in caplog.text
+
+
+async def test_slow_queries_capture_plans_on_separate_connection(db):
+    slow_query_log = SlowQueryLog(threshold=0, sample_rate=1.0, explain_interval=0)
+    db.slow_query_log = slow_query_log
+    try:
+        await db.execute("insert into users (email, name) values ('plan@example.com', 'Plan')")
+        await asyncio.gather(*slow_query_log._explains)
+        await db.fetch("select id, email from users where email = $1", "plan@example.com")
+        await asyncio.gather(*slow_query_log._explains)
+    finally:
+        db.slow_query_log = None
+
+    read, write = sorted(slow_query_log.top(), key=lambda stats: stats.query.startswith("insert"))
+    assert read.plan[0]["Plan"]["Actual Rows"] == 1
+    assert "Shared Hit Blocks" in read.plan[0]["Plan"]
+    assert "Actual Rows" not in write.plan[0]["Plan"]
+    assert "plan@example.com" not in json.dumps(read.plan)
+    # EXPLAIN of a write does not execute it.
+    assert await db.fetchval("select count(*) from users") == 1
@@ -0,0 +1,31 @@
+import asyncio
+
+from src.application.services.user_counter import UserCounter
+from src.domain.entities.user import User
+from src.infrastructure.repositories.in_memory_user_repository import InMemoryUserRepository
+
+
+async def test_counter_is_adjusted_between_refreshes():
+    repository = InMemoryUserRepository()
+    await repository.create(User(id=None, email="a@example.com", name="A"))
+    counter = UserCounter(repository, refresh_interval=0)
+
+    counter.adjust(5)
+    assert await counter.get() == 1
+
+    counter.adjust(1)
+    counter.adjust(-3)
+    assert await counter.get() == 0
+
+
+async def test_counter_refreshes_in_background():
+    repository = InMemoryUserRepository()
+    counter = UserCounter(repository, refresh_interval=0.01)
+    assert await counter.get() == 0
+
+    await repository.create(User(id=None, email="late@example.com", name="Late"))
+    await asyncio.sleep(0.05)
+
+    assert await counter.get() == 1
+    await counter.stop()
+    assert counter._task is None
@@ -0,0 +1,23 @@
+from src.domain.entities.user import User
+from src.infrastructure.repositories.postgres_user_repository import map_rows_to_users
+
+
+def test_user_normalizes_email():
+    assert User(id=None, email="Mixed@Example.COM", name="Mixed").email == "mixed@example.com"
+
+
+def test_user_is_slotted():
+    user = User(id=1, email="slots@example.com", name="Slots")
+
+    assert not hasattr(user, "__dict__")
+
+
+def test_map_rows_to_users_fills_entities_positionally():
+    rows = [(1, "one@example.com", "One", None, None), (2, "two@example.com", "Two", None, None)]
+
+    users = map_rows_to_users(rows)
+
+    assert users == [
+        User(id=1, email="one@example.com", name="One"),
+        User(id=2, email="two@example.com", name="Two"),
+    ]
@@ -1,5 +1,14 @@
+import csv
+import io
+import asyncio
+import json
+
+import msgpack
 from httpx import AsyncClient
 
+from src.infrastructure.database.change_feed import PostgresUserChangeFeed
+from src.infrastructure.database.connection import db_connection
+
 
 async def test_create_user_invalid_email(client: AsyncClient):
     user_data = {
@@ -38,6 +47,18 @@ async def test_create_user_duplicate_email(client: AsyncClient):
     assert response.status_code == 409
 
 
+async def test_create_user_concurrent_duplicates(client: AsyncClient):
+    user_data = {
+        "email": "race@example.com",
+        "name": "Race User"
+    }
+    responses = await asyncio.gather(
+        *(client.post("/users/", json=user_data) for _ in range(5))
+    )
+
+    assert sorted(r.status_code for r in responses) == [201, 409, 409, 409, 409]
+
+
 async def test_get_user_by_id(client: AsyncClient):
     user_data = {
         "email": "getuser@example.com",
@@ -60,6 +81,59 @@ async def test_get_user_not_found(client: AsyncClient):
     assert response.status_code == 404
 
 
+async def test_get_user_with_fields(client: AsyncClient):
+    created = await client.post("/users/", json={"email": "sparse@example.com", "name": "Sparse"})
+    user_id = created.json()["id"]
+
+    response = await client.get(f"/users/{user_id}", params={"fields": "email,id"})
+    assert response.status_code == 200
+    assert response.json() == {"id": user_id, "email": "sparse@example.com"}
+    assert response.headers["etag"] == created.headers["etag"]
+
+    response = await client.get("/users/999999", params={"fields": "id"})
+    assert response.status_code == 404
+
+
+async def test_get_users_with_fields_and_unknown_field(client: AsyncClient):
+    for i in range(3):
+        await client.post("/users/", json={"email": f"proj{i}@example.com", "name": f"Proj {i}"})
+
+    response = await client.get("/users/", params={"fields": "email", "limit": 2})
+    assert response.status_code == 200
+    assert response.json() == [{"email": "proj0@example.com"}, {"email": "proj1@example.com"}]
+    full = await client.get("/users/", params={"limit": 2})
+    assert response.headers["etag"] == full.headers["etag"]
+
+    next_page = await client.get(
+        "/users/", params={"fields": "email", "cursor": response.headers["x-next-cursor"]}
+    )
+    assert next_page.json() == [{"email": "proj2@example.com"}]
+
+    response = await client.get("/users/", params={"fields": "email,password"})
+    assert response.status_code == 422
+
+
+async def test_get_users_negotiates_msgpack_and_compression(client: AsyncClient):
+    for i in range(20):
+        await client.post("/users/", json={"email": f"wire{i}@example.com", "name": f"Wire {i}"})
+
+    response = await client.get(
+        "/users/", headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["content-encoding"] == "gzip"
+    users = msgpack.unpackb(response.content)
+    assert [user["email"] for user in users[:2]] == ["wire0@example.com", "wire1@example.com"]
+
+    revalidated = await client.get(
+        "/users/", headers={"If-None-Match": response.headers["etag"], "Accept-Encoding": "gzip"}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    assert revalidated.headers["vary"] == "Accept, Accept-Encoding"
+
+
 async def test_get_all_users(client: AsyncClient):
     response = await client.get("/users/")
     assert response.status_code == 200
@@ -88,6 +162,15 @@ async def test_update_user(client: AsyncClient):
     assert data["email"] == user_data["email"]
 
 
+async def test_update_user_duplicate_email(client: AsyncClient):
+    await client.post("/users/", json={"email": "taken@example.com", "name": "Taken"})
+    create_response = await client.post("/users/", json={"email": "free@example.com", "name": "Free"})
+    user_id = create_response.json()["id"]
+
+    response = await client.put(f"/users/{user_id}", json={"email": "taken@example.com"})
+    assert response.status_code == 409
+
+
 async def test_update_user_not_found(client: AsyncClient):
     update_data = {
         "name": "Updated Name"
@@ -115,3 +198,315 @@ async def test_delete_user_not_found(client: AsyncClient):
     response = await client.delete("/users/999999")
     assert response.status_code == 404
 
+
+
+async def test_get_all_users_cursor_pagination(client: AsyncClient):
+    for i in range(3):
+        await client.post("/users/", json={"email": f"page{i}@example.com", "name": f"Page {i}"})
+
+    first_page = await client.get("/users/", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert [u["email"] for u in first_page.json()] == ["page0@example.com", "page1@example.com"]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = await client.get("/users/", params={"limit": 2, "cursor": cursor})
+    assert second_page.status_code == 200
+    assert [u["email"] for u in second_page.json()] == ["page2@example.com"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+async def test_get_all_users_cursor_pagination_descending(client: AsyncClient):
+    for i in range(3):
+        await client.post("/users/", json={"email": f"desc{i}@example.com", "name": f"Desc {i}"})
+
+    first_page = await client.get("/users/", params={"limit": 2, "order": "desc"})
+    assert [u["email"] for u in first_page.json()] == ["desc2@example.com", "desc1@example.com"]
+
+    second_page = await client.get(
+        "/users/", params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}
+    )
+    assert [u["email"] for u in second_page.json()] == ["desc0@example.com"]
+
+
+async def test_get_all_users_invalid_cursor(client: AsyncClient):
+    response = await client.get("/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_create_users_batch(client: AsyncClient):
+    await client.post("/users/", json={"email": "existing@example.com", "name": "Existing"})
+
+    response = await client.post("/users/batch", json={"users": [
+        {"email": "batch1@example.com", "name": "Batch 1"},
+        {"email": "existing@example.com", "name": "Existing Again"},
+        {"email": "batch2@example.com", "name": "Batch 2"},
+        {"email": "BATCH1@example.com", "name": "Batch 1 Again"},
+    ]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert data["duplicates"] == 2
+    assert [item["status"] for item in data["results"]] == [
+        "created", "duplicate", "created", "duplicate",
+    ]
+    assert data["results"][0]["user"]["email"] == "batch1@example.com"
+    assert data["results"][1]["user"] is None
+
+    users = (await client.get("/users/")).json()
+    assert len(users) == 3
+
+
+async def test_create_users_batch_empty(client: AsyncClient):
+    response = await client.post("/users/batch", json={"users": []})
+    assert response.status_code == 422
+
+
+async def test_update_users_batch(client: AsyncClient):
+    first = (await client.post("/users/", json={"email": "bulk1@example.com", "name": "Bulk 1"})).json()
+    second = (await client.post("/users/", json={"email": "bulk2@example.com", "name": "Bulk 2"})).json()
+
+    response = await client.patch("/users/batch", json={"users": [
+        {"id": first["id"], "name": "Bulk One"},
+        {"id": second["id"], "email": "bulk1@example.com"},
+        {"id": 999999, "name": "Ghost"},
+    ]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert (data["updated"], data["conflicts"], data["not_found"]) == (1, 1, 1)
+    assert [item["status"] for item in data["results"]] == ["updated", "conflict", "not_found"]
+    assert data["results"][0]["user"]["name"] == "Bulk One"
+
+    unchanged = (await client.get(f"/users/{second['id']}")).json()
+    assert unchanged["email"] == "bulk2@example.com"
+
+
+async def test_update_users_batch_flags_duplicate_target_emails(client: AsyncClient):
+    users = [
+        (await client.post("/users/", json={"email": f"claim{i}@example.com", "name": "C"})).json()
+        for i in range(3)
+    ]
+
+    response = await client.patch("/users/batch", json={"users": [
+        {"id": users[0]["id"], "email": "wanted@example.com"},
+        {"id": users[1]["id"], "email": "WANTED@example.com"},
+        {"id": users[2]["id"], "name": "Still updated"},
+    ]})
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["results"]] == [
+        "conflict", "conflict", "updated"
+    ]
+
+
+async def test_update_users_batch_rejects_duplicate_ids(client: AsyncClient):
+    response = await client.patch("/users/batch", json={"users": [
+        {"id": 1, "name": "A"},
+        {"id": 1, "name": "B"},
+    ]})
+    assert response.status_code == 422
+
+
+async def test_delete_users_batch(client: AsyncClient):
+    ids = [
+        (await client.post("/users/", json={"email": f"gone{i}@example.com", "name": "Gone"})).json()["id"]
+        for i in range(2)
+    ]
+
+    response = await client.request("DELETE", "/users/batch", json={"ids": [*ids, 999999]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert (data["deleted"], data["not_found"]) == (2, 1)
+    assert [item["status"] for item in data["results"]] == ["deleted", "deleted", "not_found"]
+    assert (await client.get(f"/users/{ids[0]}")).status_code == 404
+
+
+async def test_export_users_ndjson(client: AsyncClient):
+    for i in range(3):
+        await client.post("/users/", json={"email": f"export{i}@example.com", "name": f"Export {i}"})
+
+    response = await client.get("/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["email"] for line in lines] == [f"export{i}@example.com" for i in range(3)]
+
+
+async def test_export_users_csv(client: AsyncClient):
+    await client.post("/users/", json={"email": "csv@example.com", "name": "Csv User"})
+
+    response = await client.get("/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["email"] == "csv@example.com"
+    assert rows[0]["name"] == "Csv User"
+
+
+async def test_search_users_ranks_and_paginates(client: AsyncClient):
+    batch = [
+        {"email": "maria.smith@example.com", "name": "Maria Smith"},
+        {"email": "anna@example.com", "name": "Anna Mariani"},
+        {"email": "maria@example.com", "name": "Maria"},
+        {"email": "bob@example.com", "name": "Bob"},
+        {"email": "rosa@example.com", "name": "Rosa Maria"},
+    ]
+    await client.post("/users/batch", json={"users": batch})
+
+    first = await client.get("/users/search", params={"q": "MARIA", "limit": 3})
+    assert first.status_code == 200
+    assert [user["name"] for user in first.json()] == ["Maria", "Maria Smith", "Anna Mariani"]
+
+    rest = await client.get(
+        "/users/search",
+        params={"q": "maria", "limit": 3, "cursor": first.headers["X-Next-Cursor"]},
+    )
+    assert [user["name"] for user in rest.json()] == ["Rosa Maria"]
+    assert "X-Next-Cursor" not in rest.headers
+
+    prefix = await client.get("/users/search", params={"q": "mar", "prefix": True})
+    assert [user["name"] for user in prefix.json()] == ["Maria Smith", "Maria"]
+
+
+async def test_search_users_validates_query(client: AsyncClient):
+    assert (await client.get("/users/search", params={"q": "ma"})).status_code == 422
+    assert (await client.get("/users/search", params={"q": "m", "prefix": True})).status_code == 422
+    assert (await client.get("/users/search", params={"q": "%_%"})).json() == []
+    bad_cursor = await client.get("/users/search", params={"q": "maria", "cursor": "bad"})
+    assert bad_cursor.status_code == 400
+
+
+async def test_get_user_conditional_requests(client: AsyncClient):
+    created = await client.post("/users/", json={"email": "etag@example.com", "name": "Etag"})
+    user_id = created.json()["id"]
+    etag = created.headers["ETag"]
+
+    response = await client.get(f"/users/{user_id}")
+    assert response.headers["ETag"] == etag
+    last_modified = response.headers["Last-Modified"]
+
+    not_modified = await client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    since = await client.get(f"/users/{user_id}", headers={"If-Modified-Since": last_modified})
+    assert since.status_code == 304
+
+    await client.put(f"/users/{user_id}", json={"name": "Changed"})
+    modified = await client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+
+    missing = await client.get("/users/999999", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+
+async def test_get_all_users_if_none_match(client: AsyncClient):
+    await client.post("/users/", json={"email": "page@example.com", "name": "Page"})
+    response = await client.get("/users/")
+    etag = response.headers["ETag"]
+
+    assert (await client.get("/users/", headers={"If-None-Match": etag})).status_code == 304
+
+    await client.post("/users/", json={"email": "page2@example.com", "name": "Page 2"})
+    assert (await client.get("/users/", headers={"If-None-Match": etag})).status_code == 200
+
+
+async def test_update_user_if_match(client: AsyncClient):
+    created = await client.post("/users/", json={"email": "match@example.com", "name": "Match"})
+    user_id = created.json()["id"]
+    etag = created.headers["ETag"]
+
+    first = await client.put(
+        f"/users/{user_id}", json={"name": "First"}, headers={"If-Match": etag}
+    )
+    assert first.status_code == 200
+
+    stale = await client.put(
+        f"/users/{user_id}", json={"name": "Second"}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+    assert (await client.get(f"/users/{user_id}")).json()["name"] == "First"
+
+    assert (await client.put(
+        f"/users/{user_id}", json={"name": "Third"}, headers={"If-Match": '"garbage"'}
+    )).status_code == 412
+    assert (await client.put(
+        "/users/999999", json={"name": "Ghost"}, headers={"If-Match": "*"}
+    )).status_code == 404
+    current = first.headers["ETag"]
+    assert (await client.put(
+        f"/users/{user_id}", json={"name": "Weak"}, headers={"If-Match": f"W/{current}"}
+    )).status_code == 412
+    assert (await client.put(
+        f"/users/{user_id}", json={"name": "Fresh"}, headers={"If-Match": current}
+    )).status_code == 200
+
+
+async def test_update_user_if_match_without_updated_at(client: AsyncClient):
+    created = await client.post("/users/", json={"email": "legacy@example.com", "name": "Legacy"})
+    user_id = created.json()["id"]
+    await db_connection.execute("update users set updated_at = null where id = $1", user_id)
+    etag = (await client.get(f"/users/{user_id}")).headers["ETag"]
+
+    response = await client.put(
+        f"/users/{user_id}", json={"name": "Migrated"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Migrated"
+
+
+async def test_get_all_users_total_count(client: AsyncClient):
+    users = [{"email": f"total{i}@example.com", "name": f"Total {i}"} for i in range(3)]
+    await client.post("/users/batch", json={"users": users})
+
+    plain = await client.get("/users/", params={"limit": 1})
+    assert "X-Total-Count" not in plain.headers
+
+    exact = await client.get("/users/", params={"limit": 1, "total": "exact"})
+    assert exact.headers["X-Total-Count"] == "3"
+
+    estimated = await client.get("/users/", params={"limit": 1, "total": "estimated"})
+    assert int(estimated.headers["X-Total-Count"]) >= 0
+
+    cached = await client.get("/users/", params={"total": "cached"})
+    assert cached.headers["X-Total-Count"] == "3"
+    await client.post("/users/", json={"email": "total3@example.com", "name": "Total 3"})
+    await client.delete(f"/users/{cached.json()[0]['id']}")
+    await client.delete(f"/users/{cached.json()[1]['id']}")
+    cached = await client.get("/users/", params={"total": "cached"})
+    assert cached.headers["X-Total-Count"] == "2"
+
+    assert (await client.get("/users/", params={"total": "bogus"})).status_code == 422
+
+
+async def test_stream_user_changes_rejects_bad_last_event_id(client: AsyncClient):
+    response = await client.get("/users/changes", headers={"Last-Event-ID": "yesterday"})
+    assert response.status_code == 400
+
+
+async def test_stream_user_changes_accepts_timezone_aware_positions(
+    client: AsyncClient, monkeypatch
+):
+    async def closed_feed():
+        return
+        yield
+
+    monkeypatch.setattr(PostgresUserChangeFeed, "subscribe", lambda self: closed_feed())
+    created = await client.post("/users/", json={"email": "tz@example.com", "name": "Tz"})
+    user_id = created.json()["id"]
+
+    by_since = await client.get("/users/changes", params={"since": "2000-01-01T00:00:00Z"})
+    by_event_id = await client.get(
+        "/users/changes", headers={"Last-Event-ID": "2000-01-01T02:00:00+02:00/0"}
+    )
+
+    for response in (by_since, by_event_id):
+        assert response.status_code == 200
+        assert f'"id": {user_id}' in response.text
+        assert "event: insert" in response.text